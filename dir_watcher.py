@@ -0,0 +1,118 @@
+import ctypes
+import threading
+import time
+from loguru import logger
+
+# 引入 win32file 模块用于 ReadDirectoryChangesW (与 win32pdh 同属 pywin32)
+try:
+    import win32con
+    import win32file
+except ImportError:
+    win32con = None
+    win32file = None
+
+# OpenThread 访问权限：CancelSynchronousIo 要求线程句柄具有 THREAD_TERMINATE
+THREAD_TERMINATE = 0x0001
+
+# ----------------------------------------------------
+# 目录变更监视 (ReadDirectoryChangesW)
+# 由操作系统在目录内容变化时唤醒监视线程，调用方只需比较 generation 是否变化，
+# 目录没有写入时不必每个周期重新扫描全部文件。
+# ----------------------------------------------------
+
+class DirectoryChangeWatcher:
+    """
+    在守护线程中对 path (含子目录) 阻塞调用 ReadDirectoryChangesW，
+    每收到一批文件/目录名变更通知就将 generation 加 1。
+    不可用 (非 Windows、缺少 pywin32、目录不存在) 或监视出错时 alive 为 False，调用方应回退到轮询扫描。
+    退出前调用 stop() 取消阻塞中的调用并关闭目录句柄。
+    """
+
+    # 单次通知缓冲区大小 (字节)；溢出时系统返回空结果，同样计为一次变更
+    BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        # 只由监视线程递增，调用方只读比较 (int 赋值在 GIL 下是原子的)
+        self.generation = 0
+        self.alive = False
+        self._thread = None
+        self._stopping = False
+
+    def start(self):
+        """打开目录句柄并启动监视线程，返回是否可用。"""
+        if win32file is None:
+            logger.warning("缺少 pywin32 (win32file) 模块，目录变更监视不可用，回退到轮询扫描。")
+            return False
+
+        try:
+            handle = win32file.CreateFile(
+                self.path,
+                0x0001, # FILE_LIST_DIRECTORY
+                win32con.FILE_SHARE_READ | win32con.FILE_SHARE_WRITE | win32con.FILE_SHARE_DELETE,
+                None,
+                win32con.OPEN_EXISTING,
+                win32con.FILE_FLAG_BACKUP_SEMANTICS,
+                None,
+            )
+        except Exception as e:
+            logger.warning(f"打开监视目录 '{self.path}' 失败，回退到轮询扫描。错误: {e}")
+            return False
+
+        self.alive = True
+        self._thread = threading.Thread(target=self._watch_loop, args=(handle,), name="dir-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"已开始监视目录变更: {self.path}")
+        return True
+
+    def stop(self, timeout=1.0):
+        """
+        停止监视并关闭目录句柄，可重复调用。
+        监视线程阻塞在同步 ReadDirectoryChangesW 中，通过 CancelSynchronousIo 取消该调用，
+        线程随后退出并在 finally 中关闭句柄；最多等待 timeout 秒。
+        """
+        self._stopping = True
+        thread = self._thread
+        if thread is None:
+            return
+        # 独立的 WinDLL 实例：设置 restype/argtypes 不影响其他模块使用的 ctypes.windll.kernel32
+        kernel32 = ctypes.WinDLL("kernel32")
+        kernel32.OpenThread.restype = ctypes.c_void_p
+        kernel32.CancelSynchronousIo.argtypes = (ctypes.c_void_p,)
+        kernel32.CloseHandle.argtypes = (ctypes.c_void_p,)
+        deadline = time.monotonic() + timeout
+        # 线程可能恰好处于两次调用之间，取消落空时稍后重试
+        while thread.is_alive() and time.monotonic() < deadline:
+            thread_handle = kernel32.OpenThread(THREAD_TERMINATE, False, thread.native_id)
+            if thread_handle:
+                kernel32.CancelSynchronousIo(thread_handle)
+                kernel32.CloseHandle(thread_handle)
+            thread.join(0.05)
+        if thread.is_alive():
+            logger.warning(f"目录变更监视线程在 {timeout} 秒内未退出: {self.path}")
+        else:
+            logger.info(f"已停止监视目录变更: {self.path}")
+
+    def _watch_loop(self, handle):
+        try:
+            while not self._stopping:
+                # 阻塞直到有变更；子目录 (按日期划分的输出目录) 一并监视
+                win32file.ReadDirectoryChangesW(
+                    handle,
+                    self.BUFFER_SIZE,
+                    True,
+                    win32con.FILE_NOTIFY_CHANGE_FILE_NAME | win32con.FILE_NOTIFY_CHANGE_DIR_NAME,
+                    None,
+                    None,
+                )
+                self.generation += 1
+        except Exception as e:
+            # stop() 取消调用时会抛出 ERROR_OPERATION_ABORTED，属于正常退出
+            if not self._stopping:
+                logger.error(f"目录变更监视中断，回退到轮询扫描。错误: {e}")
+        finally:
+            self.alive = False
+            try:
+                handle.Close()
+            except Exception:
+                pass
@@ -1,14 +1,19 @@
 import tkinter as tk
 from tkinter import ttk 
-import win32pdh
 from loguru import logger
-import subprocess # 【新增】用于运行 PowerShell 命令
 import time
 import sys
+import concurrent.futures # 【新增】用于后台数据采集
+import functools
+import math
+# 【改动】PDH 查询与引擎解析由 pdh_collector 模块统一提供 (与 sd-webui_monitor.py 共用)
+from pdh_collector import PdhGpuCollector, CORE_ENGINES_ORDER
+# 【新增】常驻 PowerShell 会话，VRAM 回退查询不再每次启动 powershell.exe
+from powershell_session import PowerShellSession, parse_number
 
 # --- Loguru 配置 (完美的日志输出) ---
 logger.remove()
-logger.add(sys.stderr, level="INFO", format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>", enqueue=True)
+logger.add(sys.stderr, level="INFO", format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>")
 
 # ----------------------------------------------------
 # 核心常量定义
@@ -19,9 +24,33 @@ INTEL_ARC_A770_TOTAL_MB = 16 * 1024
 # ----------------------------------------------------
 # PDH (Performance Data Helper) 初始化
 # ----------------------------------------------------
-PDH_AVAILABLE = True
-QUERY_HANDLE = None
-ENGINE_COUNTERS = {} 
+# 【改动】同一个查询句柄同时承载引擎利用率与专有显存计数器
+PDH_COLLECTOR = PdhGpuCollector()
+
+# PDH 不可用 (初始化失败或 poll() 遇到句柄失效) 时重新打开查询的冷却时间 (秒)
+PDH_RETRY_COOLDOWN_SECONDS = 60
+# 下一次允许调用 open() 的单调时钟时间；0.0 表示首次采集时立即打开
+_next_pdh_open_time = 0.0
+# cleanup_pdh_resources() 之后置为 True，之后不再重新打开查询
+_pdh_shutdown = False
+
+def _pdh_init():
+    """
+    【优化】延迟初始化 PDH：计数器枚举在冷启动时可能耗时数秒，不再在 import 时执行，
+    而是在首次采集 (后台线程) 时打开查询，之后句柄可用时直接返回 True。
+    poll() 遇到句柄失效会置 available=False，此时按 PDH_RETRY_COOLDOWN_SECONDS 冷却后重新 open()，
+    冷却期内返回 False (结果不能缓存，否则一次偶发错误就会永久停止监控)。
+    """
+    global _next_pdh_open_time
+    if _pdh_shutdown:
+        return False
+    if PDH_COLLECTOR.available:
+        return True
+    now = time.monotonic()
+    if now < _next_pdh_open_time:
+        return False
+    _next_pdh_open_time = now + PDH_RETRY_COOLDOWN_SECONDS
+    return PDH_COLLECTOR.open()
 
 # 定义引擎类型和功能的中文翻译
 ENGINE_TRANSLATIONS = {
@@ -30,36 +59,30 @@ ENGINE_TRANSLATIONS = {
     "Copy": "数据复制 (显存与内存/设备间传输)",
 }
 
-# 需求：计算放第一，复制放第二，第三才是3d
-CORE_ENGINES_TO_MONITOR = ["Compute", "Copy", "3D"] 
+# 需求：计算放第一，复制放第二，第三才是3d (顺序见 pdh_collector.CORE_ENGINES_ORDER)
 
-try:
-    QUERY_HANDLE = win32pdh.OpenQuery()
-    COUNTER_PATH = r"\GPU Engine(*)\Utilization Percentage" 
-    counter_paths = win32pdh.ExpandCounterPath(COUNTER_PATH)
-    
-    for path in counter_paths:
-        try:
-            full_engine_key = path.split('(')[1].split(')')[0]
-            counter_handle = win32pdh.AddCounter(QUERY_HANDLE, path)
-            ENGINE_COUNTERS[full_engine_key] = counter_handle
-        except Exception as e:
-            logger.warning(f"添加计数器失败: {path}。错误: {e}")
-            
-    if not ENGINE_COUNTERS:
-        logger.error("未找到任何 GPU 引擎性能计数器实例，PDH 初始化失败。")
-        PDH_AVAILABLE = False
-    else:
-        win32pdh.CollectQueryData(QUERY_HANDLE)
-        logger.info(f"PDH 成功初始化，找到 {len(ENGINE_COUNTERS)} 个 GPU 引擎计数器（含进程）。")
-        
-except Exception as e:
-    PDH_AVAILABLE = False
-    logger.error(f"PDH 初始化失败。错误: {e}")
+# 【优化】进度条样式查找表，按整数百分比 (0-100) 索引：<=50 绿色 | <=75 橙色 | >75 红色
+STYLE_TABLE = (["Green.Horizontal.TProgressbar"] * 51
+               + ["Orange.Horizontal.TProgressbar"] * 25
+               + ["Red.Horizontal.TProgressbar"] * 25)
+
+def get_progressbar_style(util):
+    """根据利用率查表返回进度条样式名 (小数向上取整，与 <=50 / <=75 的边界一致)。"""
+    return STYLE_TABLE[min(max(math.ceil(util), 0), 100)]
+
+@functools.lru_cache(maxsize=256)
+def format_engine_label(engine, util):
+    """生成核心引擎标签文本；引擎名翻译与格式化结果按 (引擎, 利用率) 缓存。"""
+    cn_name = ENGINE_TRANSLATIONS.get(engine, engine)
+    return f"[{cn_name} ({engine})]: {util:>3d}%"
 
 # ----------------------------------------------------
 # 模块化功能：通过 PowerShell 获取 VRAM 显存使用量 (核心改动点)
 # ----------------------------------------------------
+# 首次调用时才启动 powershell.exe，之后复用同一进程；查询函数在会话启动时定义一次
+PS_SESSION = PowerShellSession(
+    init_script=r"function Get-LocalVram { ((Get-Counter '\GPU Process Memory(*)\Local Usage').CounterSamples | Measure-Object CookedValue -Sum).Sum }"
+)
 
 def get_vram_stats_powershell(total_vram_fallback_mb: int = INTEL_ARC_A770_TOTAL_MB) -> dict:
     """
@@ -71,25 +94,20 @@ def get_vram_stats_powershell(total_vram_fallback_mb: int = INTEL_ARC_A770_TOTAL
     try:
         # 获取 专有显存占用 (Local Usage) - 对应 \GPU Process Memory(*)\Local Usage
         # 命令来自 sd-webui_monitor.py
-        mem_cmd = r'powershell -ExecutionPolicy Bypass -Command "((Get-Counter \"\GPU Process Memory(*)\Local Usage\").CounterSamples | Select-Object -ExpandProperty CookedValue | Measure-Object -Sum).Sum"'
-        
-        # 使用 subprocess 运行 PowerShell 命令
-        result = subprocess.run(
-            mem_cmd, 
-            capture_output=True, 
-            text=True, 
-            check=True, 
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
+        # 在常驻 PowerShell 会话中执行 (Get-LocalVram 已在会话启动时定义)
+        output = PS_SESSION.run("Get-LocalVram")
         
-        # mem_used_bytes 的单位是 Bytes
-        mem_used_bytes = float(result.stdout.strip() or 0)
+        # mem_used_bytes 的单位是 Bytes (空输出视为 0，非数值视为失败)
+        mem_used_bytes = parse_number(output)
+        if mem_used_bytes is None:
+            raise RuntimeError(f"无法解析 PowerShell 输出: {output!r}")
         mem_used_mb = mem_used_bytes / (1024 * 1024)
         
         # 计算百分比
         vram_local_percent = (mem_used_bytes / (mem_total_mb * 1024 * 1024)) * 100 if mem_total_mb > 0 else 0
         
-        logger.info(f"PowerShell 成功获取 VRAM 使用量: {mem_used_mb:.2f} MB。")
+        # 每周期调用，仅在 DEBUG 启用时才格式化
+        logger.opt(lazy=True).debug("PowerShell 成功获取 VRAM 使用量: {} MB。", lambda: f"{mem_used_mb:.2f}")
         
         return {
             "total_mb": mem_total_mb,
@@ -98,8 +116,8 @@ def get_vram_stats_powershell(total_vram_fallback_mb: int = INTEL_ARC_A770_TOTAL
             "status": "PS_SUCCESS"
         }
 
-    except subprocess.CalledProcessError as e:
-        logger.error(f"PowerShell VRAM 命令执行失败: {e.returncode}, 输出: {e.stderr.strip()}")
+    except RuntimeError as e:
+        logger.error(f"PowerShell VRAM 命令执行失败: {e}")
         logger.warning("请确保 Windows 性能计数器正常。")
     except Exception as e:
         logger.error(f"VRAM 获取失败: {e}")
@@ -112,60 +130,47 @@ def get_vram_stats_powershell(total_vram_fallback_mb: int = INTEL_ARC_A770_TOTAL
         "status": "PS_FAIL_FALLBACK"
     }
 
+def get_vram_stats_pdh(mem_used_bytes: float, total_vram_mb: int = INTEL_ARC_A770_TOTAL_MB) -> dict:
+    """由 PDH 专有显存计数器的读数 (Bytes) 构造与 get_vram_stats_powershell 相同结构的结果。"""
+    mem_used_mb = mem_used_bytes / (1024 * 1024)
+    return {
+        "total_mb": total_vram_mb,
+        "used_mb": mem_used_mb,
+        "utilization_percent": (mem_used_mb / total_vram_mb) * 100 if total_vram_mb > 0 else 0,
+        "status": "PDH_SUCCESS"
+    }
+
 # ----------------------------------------------------
 # 模块化功能：获取核心引擎利用率 (PDH 方式不变，以获取 Compute/Copy/3D breakdown)
 # ----------------------------------------------------
 
-def get_core_gpu_utilization():
-    """获取 GPU 核心引擎 (Compute, Copy, 3D) 的聚合利用率。"""
-    if not PDH_AVAILABLE:
-        return {"error": "PDH_NOT_AVAILABLE"}
+def get_core_gpu_utilization(sample=None):
+    """
+    获取 GPU 核心引擎 (Compute, Copy, 3D) 的聚合利用率 (整数百分比)。
+    传入 sample 时复用该次 poll() 的结果，否则自行采集一次。
+    """
+    if sample is None:
+        if not _pdh_init():
+            return {"error": "PDH_NOT_AVAILABLE"}
+        sample = PDH_COLLECTOR.poll()
+        if sample is None:
+            return {"error": "PDH 数据收集失败"}
         
-    core_engine_utilization = {engine: 0 for engine in CORE_ENGINES_TO_MONITOR}
-    success_count = 0
-    total_engine_count = len(ENGINE_COUNTERS)
+    # 每周期调用，仅在 DEBUG 启用时才输出
+    logger.debug("数据收集：总计数器实例 {}。", sample["instance_count"])
     
-    try:
-        win32pdh.CollectQueryData(QUERY_HANDLE)
-        
-        for full_engine_key, counter_handle in ENGINE_COUNTERS.items():
-            try:
-                type_val, value = win32pdh.GetFormattedCounterValue(counter_handle, win32pdh.PDH_FMT_DOUBLE)
-                util_percent = int(value) 
-                
-                if util_percent > 0:
-                    success_count += 1
-                    parts = full_engine_key.split('_')
-                    engine_type = parts[-1] 
-                    
-                    if engine_type in CORE_ENGINES_TO_MONITOR:
-                        # 核心利用率是所有进程中该引擎的利用率之和
-                        core_engine_utilization[engine_type] += util_percent
-                        
-            except Exception as e:
-                if hasattr(e, 'winerror') and e.winerror not in [win32pdh.PDH_NO_DATA, win32pdh.PDH_CALC_COUNTER_VALUE_FIRST]:
-                    logger.warning(f"获取 {full_engine_key} 计数器值失败: {e}")
-                    
-        logger.info(f"数据收集：总计数器实例 {total_engine_count}, 成功获取 {success_count} 个非零实例。")
-        
-        return core_engine_utilization
-        
-    except Exception as e:
-        logger.error(f"PDH 数据收集失败: {e}")
-        return {"error": str(e)}
+    return {engine: int(util) for engine, util in sample["engines"].items()}
 
-def cleanup_pdh_resources():
-    """关闭全局 PDH 查询句柄，释放资源。"""
-    global QUERY_HANDLE
-    global PDH_AVAILABLE
-    
-    if PDH_AVAILABLE and QUERY_HANDLE:
-         try:
-             win32pdh.CloseQuery(QUERY_HANDLE)
-             QUERY_HANDLE = None
-             logger.info("PDH 查询资源已关闭。")
-         except Exception as e:
-             logger.error(f"关闭 PDH 查询失败: {e}")
+def cleanup_pdh_resources(close_pdh=True):
+    """
+    关闭 PDH 查询句柄和常驻 PowerShell 会话，释放资源 (之后 _pdh_init 不再重新打开)。
+    close_pdh=False 时保留 PDH 句柄 (仍有采集在使用它)，由进程退出时的 atexit 关闭。
+    """
+    global _pdh_shutdown
+    _pdh_shutdown = True
+    if close_pdh:
+        PDH_COLLECTOR.close()
+    PS_SESSION.close()
 
 
 # ----------------------------------------------------
@@ -174,13 +179,25 @@ def cleanup_pdh_resources():
 
 class GpuMonitorApp:
     
+    # 监控更新间隔 (毫秒)
+    UPDATE_INTERVAL_MS = 1000
+    # 【新增】窗口最小化/隐藏时的轮询间隔 (毫秒)，此时跳过数据采集
+    HIDDEN_UPDATE_INTERVAL_MS = 5000
+    # 关闭窗口时等待正在进行的采集结束的最长时间 (秒)，之后才释放 PDH 资源
+    CLOSE_WAIT_TIMEOUT_SECONDS = 2.0
+    
     def __init__(self, master):
         self.master = master
+        # 【新增】当前轮询间隔，由 <Map>/<Unmap> 事件切换
+        self._poll_ms = self.UPDATE_INTERVAL_MS
         master.geometry("800x450") 
         master.title("GPU 核心引擎与 VRAM 监控 (PowerShell/PDH Hybrid)")
         
         logger.info("初始化 GPU 监控应用...")
         
+        # 【新增】单线程后台采集，避免 PowerShell/PDH 阻塞 Tk 事件循环
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        
         # ------------------- 可视化组件和样式定义 --------------------
         self.style = ttk.Style()
         
@@ -189,78 +206,113 @@ class GpuMonitorApp:
         self.style.configure("Orange.Horizontal.TProgressbar", troughcolor='white', background='orange', troughrelief='flat')
         self.style.configure("Red.Horizontal.TProgressbar", troughcolor='white', background='red', troughrelief='flat')
 
-        # 主内容框架
+        # 主内容框架 (【优化】先不 pack，子组件全部创建完成后再一次性显示，只触发一次布局计算)
         self.main_frame = ttk.Frame(master)
-        self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # 错误或警告信息标签
         self.label_status = tk.Label(master, text="", fg="red")
         self.label_status.pack(pady=5)
         
-        if PDH_AVAILABLE: 
-            init_label = tk.Label(self.main_frame, text="正在收集数据并初始化条形图...")
-            init_label.pack()
-            self.update_gpu_data()
-        else:
-            error_label = tk.Label(self.main_frame, 
-                                   text="PDH/性能计数器不可用，无法监控 GPU 引擎。",
-                                   fg="red")
-            error_label.pack()
+        # 【优化】组件只创建一次，之后每个周期仅通过 .config 原地更新
+        self._engine_widgets = {}
+        self.vram_label = None
+        self.vram_progressbar = None
+        self._vram_bar_visible = False
+        # 【优化】上一次渲染的数据签名，数据未变化时跳过 UI 更新
+        self._last_sig = None
+        # 正在执行的采集任务，以及窗口是否正在关闭 (关闭后采集完成回调不再调度 Tk)
+        self._inflight = None
+        self._closing = False
+        # 【优化】每个进度条上一次使用的样式名，档位不变时不重新设置 style
+        self._last_style = {}
+        # 状态标签当前是否显示着错误信息，采集恢复后清空
+        self._status_error = False
+        
+        # 窗口先行绘制，PDH 在第一次后台采集时才初始化
+        self._build_widgets()
+        self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10, before=self.label_status)
+        self.update_gpu_data()
             
         # 注册窗口关闭时的清理操作
         master.protocol("WM_DELETE_WINDOW", self.on_closing)
         
-    def _clear_main_frame(self):
-        """清除 main_frame 中的所有组件"""
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-
-    def _render_core_engines_summary(self, core_engine_utilization):
+        # 【新增】窗口可见性变化时切换轮询间隔
+        master.bind("<Unmap>", self._on_visibility_change)
+        master.bind("<Map>", self._on_visibility_change)
+        
+    def _build_widgets(self):
         """
-        渲染核心引擎 (Compute, Copy, 3D) 和 VRAM 汇总信息。
+        一次性创建核心引擎 (Compute, Copy, 3D) 和 VRAM 的标签与进度条。
+        后续周期只修改这些组件的文本和数值，不再销毁/重建。
         """
-        
         tk.Label(self.main_frame, 
                  text="--- GPU 核心引擎利用率 (PDH) ---", 
                  font=("Consolas", 10, "bold"), 
                  anchor=tk.W).pack(fill=tk.X, pady=(0, 5))
         
-        # 核心引擎按 CORE_ENGINES_TO_MONITOR 顺序 (Compute, Copy, 3D) 渲染
-        for engine in CORE_ENGINES_TO_MONITOR: 
-            util = core_engine_utilization.get(engine, 0)
-            cn_name = ENGINE_TRANSLATIONS.get(engine, engine)
-            
-            # 确定进度条样式
-            if util <= 50:
-                style_name = "Green.Horizontal.TProgressbar"
-            elif util <= 75:
-                style_name = "Orange.Horizontal.TProgressbar"
-            else:
-                style_name = "Red.Horizontal.TProgressbar"
-
+        # 核心引擎按 CORE_ENGINES_ORDER 顺序 (Compute, Copy, 3D) 创建
+        for engine in CORE_ENGINES_ORDER: 
             # 容器
             engine_frame = ttk.Frame(self.main_frame)
             engine_frame.pack(fill=tk.X, pady=2)
             
             # 引擎名称和利用率标签
-            tk.Label(engine_frame, 
-                     text=f"[{cn_name} ({engine})]: {util:>3d}%",
-                     font=("Consolas", 10), 
-                     width=50, 
-                     anchor=tk.W).pack(side=tk.LEFT)
+            label = tk.Label(engine_frame, 
+                             text="",
+                             font=("Consolas", 10), 
+                             width=50, 
+                             anchor=tk.W)
+            label.pack(side=tk.LEFT)
             
             # 进度条
             progressbar = ttk.Progressbar(engine_frame, 
                                           orient="horizontal", 
                                           length=200, 
                                           mode="determinate",
-                                          style=style_name)
+                                          style="Green.Horizontal.TProgressbar")
             progressbar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
-            progressbar['value'] = min(util, 100) 
             
-        # ------------------- VRAM 渲染 -------------------
-        vram_data = get_vram_stats_powershell()
+            self._engine_widgets[engine] = (label, progressbar)
+            
+        # ------------------- VRAM 组件 -------------------
+        #  VRAM 容器
+        vram_frame = ttk.Frame(self.main_frame)
+        vram_frame.pack(fill=tk.X, pady=(10, 5))
         
+        # VRAM 标签
+        self.vram_label = tk.Label(vram_frame, 
+                                   text="正在收集数据...", 
+                                   font=("Consolas", 10, "bold"),
+                                   anchor=tk.W)
+        self.vram_label.pack(side=tk.LEFT)
+                 
+        # VRAM 进度条 (获取失败时通过 pack_forget 隐藏，而不是销毁)
+        self.vram_progressbar = ttk.Progressbar(vram_frame, 
+                                                orient="horizontal", 
+                                                length=150, 
+                                                mode="determinate",
+                                                style="Green.Horizontal.TProgressbar")
+
+    def _set_bar_style(self, key, progressbar, style_name):
+        """仅在颜色档位变化时才重新设置 style，避免 ttk 每周期重新解析样式。"""
+        if self._last_style.get(key) != style_name:
+            progressbar.configure(style=style_name)
+            self._last_style[key] = style_name
+
+    def _render_core_engines_summary(self, core_engine_utilization, vram_data):
+        """
+        更新核心引擎 (Compute, Copy, 3D) 和 VRAM 汇总信息 (原地修改已有组件)。
+        """
+        # 核心引擎按 CORE_ENGINES_ORDER 顺序 (Compute, Copy, 3D) 更新
+        for engine in CORE_ENGINES_ORDER: 
+            util = core_engine_utilization.get(engine, 0)
+
+            label, progressbar = self._engine_widgets[engine]
+            label.config(text=format_engine_label(engine, util))
+            progressbar['value'] = min(util, 100)
+            self._set_bar_style(engine, progressbar, get_progressbar_style(util))
+            
+        # ------------------- VRAM 更新 -------------------
         total_mb = vram_data.get("total_mb", 0)
         used_mb = vram_data.get("used_mb", -1)
         util_percent = vram_data.get("utilization_percent", 0)
@@ -271,79 +323,135 @@ class GpuMonitorApp:
             text_vram = f"显存占用 (VRAM): {used_mb:.2f} MB / {total_mb:.0f} MB ({util_percent:.1f}%)"
             
             # VRAM 进度条样式
-            if util_percent <= 50:
-                vram_style = "Green.Horizontal.TProgressbar"
-            elif util_percent <= 75:
-                vram_style = "Orange.Horizontal.TProgressbar"
-            else:
-                vram_style = "Red.Horizontal.TProgressbar"
-            
-            #  VRAM 容器
-            vram_frame = ttk.Frame(self.main_frame)
-            vram_frame.pack(fill=tk.X, pady=(10, 5))
+            vram_style = get_progressbar_style(util_percent)
             
-            # VRAM 标签
-            tk.Label(vram_frame, 
-                     text=f"--- {text_vram} ---", 
-                     font=("Consolas", 10, "bold"),
-                     anchor=tk.W).pack(side=tk.LEFT)
-                     
-            # VRAM 进度条
-            vram_progressbar = ttk.Progressbar(vram_frame, 
-                                          orient="horizontal", 
-                                          length=150, 
-                                          mode="determinate",
-                                          style=vram_style)
-            vram_progressbar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
-            vram_progressbar['value'] = min(util_percent, 100)
+            self.vram_label.config(text=f"--- {text_vram} ---")
+            if not self._vram_bar_visible:
+                self.vram_progressbar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+                self._vram_bar_visible = True
+            self.vram_progressbar['value'] = min(util_percent, 100)
+            self._set_bar_style("VRAM", self.vram_progressbar, vram_style)
             
         else:
             text_vram = f"VRAM 总容量 {total_mb:.0f} MB。实时占用: 无法获取 (PowerShell 状态: {status})"
-            tk.Label(self.main_frame, 
-                     text=f"--- {text_vram} ---", 
-                     font=("Consolas", 10, "bold"),
-                     anchor=tk.W).pack(fill=tk.X, pady=(10, 5))
+            self.vram_label.config(text=f"--- {text_vram} ---")
+            if self._vram_bar_visible:
+                self.vram_progressbar.pack_forget()
+                self._vram_bar_visible = False
                  
     
+    def _collect_data(self):
+        """
+        【后台线程】执行所有阻塞式采集 (PDH，必要时回退 PowerShell VRAM)，不接触任何 Tk 组件。
+        """
+        # 0. 首次调用时初始化 PDH (已缓存)，不可用时返回 None 由主线程提示
+        if not _pdh_init():
+            return None
+            
+        # 1. 一次 PDH 采集同时得到核心引擎利用率和专有显存
+        sample = PDH_COLLECTOR.poll()
+        if sample is None:
+             raise Exception("PDH 数据收集失败")
+        core_engine_utilization = get_core_gpu_utilization(sample)
+             
+        # 2. VRAM：优先使用同一次 PDH 采集结果，显存计数器不可用时回退到 PowerShell
+        if sample["vram_used_bytes"] is not None:
+            vram_data = get_vram_stats_pdh(sample["vram_used_bytes"])
+        else:
+            vram_data = get_vram_stats_powershell()
+        
+        return core_engine_utilization, vram_data
+
     def update_gpu_data(self):
-        """核心控制器：定时获取并更新 GPU 引擎数据"""
+        """核心控制器：定时提交后台采集任务，结果由 _apply_stats 在主线程渲染"""
         
-        if not PDH_AVAILABLE:
-            self.master.after(1000, self.update_gpu_data)
+        # 窗口最小化/隐藏时无人查看，跳过采集，仅以慢速间隔继续检查
+        if self._poll_ms != self.UPDATE_INTERVAL_MS:
+            self.master.after(self._poll_ms, self.update_gpu_data)
             return
             
-        self._clear_main_frame()
-            
+        future = self._pool.submit(self._collect_data)
+        self._inflight = future
+        # 采集完成后将 UI 更新调度回 Tk 主线程
+        future.add_done_callback(self._on_collect_done)
+
+    def _on_collect_done(self, future):
+        """【后台线程】采集完成回调：窗口正在关闭时不再访问 (可能已销毁的) Tk 根窗口。"""
+        if self._closing:
+            return
+        self.master.after(0, self._apply_stats, future)
+
+    def _apply_stats(self, future):
+        """【主线程】渲染后台采集结果，并安排下一次采集。"""
         try:
-            # 1. 获取核心引擎利用率 (PDH)
-            core_engine_utilization = get_core_gpu_utilization()
+            result = future.result()
+            if result is None:
+                # PDH 不可用：提示后继续调度，_pdh_init 会在冷却后重新打开查询
+                self.label_status.config(text=f"PDH/性能计数器不可用，无法监控 GPU 引擎。每 {PDH_RETRY_COOLDOWN_SECONDS} 秒重试一次。", fg="red")
+                self._status_error = True
+                self.master.after(self._poll_ms, self.update_gpu_data)
+                return
+            core_engine_utilization, vram_data = result
+            if self._status_error:
+                # 采集已恢复，清除之前的错误提示
+                self.label_status.config(text="")
+                self._status_error = False
             
-            if "error" in core_engine_utilization:
-                 raise Exception(core_engine_utilization["error"])
-                 
-            # 2. 渲染 UI
-            self._render_core_engines_summary(core_engine_utilization)
+            # 渲染 UI：数据与上一周期完全相同时跳过，否则统一刷新一次
+            sig = hash((
+                tuple(core_engine_utilization[engine] for engine in CORE_ENGINES_ORDER),
+                round(vram_data.get("used_mb", -1), 2),
+                vram_data.get("status"),
+            ))
+            if sig != self._last_sig:
+                self._last_sig = sig
+                self._render_core_engines_summary(core_engine_utilization, vram_data)
+                self.master.update_idletasks()
             
             # ------------------- 控制台输出 (只输出三个核心参数) --------------------
-            core_engine_info = f"--- 核心引擎 (Compute, Copy, 3D) 提取结果 ---\n"
-            for engine, util in core_engine_utilization.items():
-                core_engine_info += f"[{engine}]: {util:>3d}% "
-            core_engine_info += "\n"
-            
-            print("\n" + core_engine_info)
-            # ******************************************************
+            # 走 DEBUG 日志而非 print；lazy=True 使 DEBUG 未启用时不拼接字符串
+            logger.opt(lazy=True).debug(
+                "核心引擎 (Compute, Copy, 3D) 提取结果: {}",
+                lambda: " ".join(f"[{engine}]: {util:>3d}%" for engine, util in core_engine_utilization.items()),
+            )
                 
+        except concurrent.futures.CancelledError:
+            # 线程池关闭时可能发生，窗口已销毁，不再调度
+            return
         except Exception as e:
             error_msg = f"数据收集失败: {e}"
             self.label_status.config(text=error_msg, fg="red")
+            self._status_error = True
             logger.error(error_msg)
 
-        self.master.after(1000, self.update_gpu_data)
+        # 上一次采集完成后再安排下一次，保证同一时刻只有一个采集任务
+        self.master.after(self._poll_ms, self.update_gpu_data)
+
+    def _on_visibility_change(self, event):
+        """<Map>/<Unmap> 回调：窗口隐藏时放慢轮询，恢复显示时还原正常间隔。"""
+        # 子组件的 Map/Unmap 事件也会冒泡到顶层窗口绑定，这里只处理主窗口本身
+        if event.widget is not self.master:
+            return
+        if self.master.state() in ("iconic", "withdrawn") or not self.master.winfo_viewable():
+            self._poll_ms = self.HIDDEN_UPDATE_INTERVAL_MS
+        else:
+            self._poll_ms = self.UPDATE_INTERVAL_MS
     
     def on_closing(self):
         """窗口关闭时执行清理操作"""
         logger.info("应用关闭。")
-        cleanup_pdh_resources() 
+        self._closing = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        # 先结束 PowerShell 会话，正阻塞在 VRAM 回退查询中的采集会立即返回
+        PS_SESSION.close()
+        # 等待正在进行的采集 (可能在 PDH open()/poll() 中) 结束，避免其在清理之后重新打开或使用查询句柄
+        collect_finished = True
+        if self._inflight is not None:
+            done, _ = concurrent.futures.wait([self._inflight], timeout=self.CLOSE_WAIT_TIMEOUT_SECONDS)
+            collect_finished = bool(done)
+            if not collect_finished:
+                logger.warning(f"采集任务在 {self.CLOSE_WAIT_TIMEOUT_SECONDS} 秒内未结束，PDH 句柄留给进程退出时的 atexit 关闭。")
+        cleanup_pdh_resources(close_pdh=collect_finished)
         self.master.destroy()
 
 if __name__ == '__main__':
@@ -0,0 +1,208 @@
+import atexit
+import functools
+import platform
+import time
+from loguru import logger
+
+# 引入 win32pdh 模块用于 GPU 引擎/显存性能计数器
+try:
+    import win32pdh
+except ImportError:
+    logger.error("未安装 'pywin32' 模块，无法使用 PDH 性能计数器。请运行 'pip install pywin32'。")
+    win32pdh = None
+
+# ----------------------------------------------------
+# PDH (Performance Data Helper) GPU 采集器
+# gpu_engine.py 与 sd-webui_monitor.py 共用，两者不再各自维护一份 PDH 初始化/采集代码
+# ----------------------------------------------------
+# GPU 引擎利用率通配计数器，每周期通过 GetFormattedCounterArray 一次性读取所有实例
+ENGINE_COUNTER_PATH = r"\GPU Engine(*)\Utilization Percentage"
+# 专有显存 (Local Usage) 通配计数器，与引擎计数器共用同一个查询句柄
+VRAM_COUNTER_PATH = r"\GPU Process Memory(*)\Local Usage"
+# 系统 “已提交” 内存 (Commit Charge)，可选，与 GPU 计数器共用同一次采集
+COMMITTED_BYTES_COUNTER_PATH = r"\Memory\Committed Bytes"
+# 网络收发速率 (字节/秒)，可选；PDH 自行计算速率，所有网卡实例求和即为总速率
+NET_RECV_COUNTER_PATH = r"\Network Interface(*)\Bytes Received/sec"
+NET_SENT_COUNTER_PATH = r"\Network Interface(*)\Bytes Sent/sec"
+
+# 有序元组用于 UI/字典的显示顺序，frozenset 用于热路径中的 O(1) 成员判断
+CORE_ENGINES_ORDER = ("Compute", "Copy", "3D")
+CORE_ENGINES_TO_MONITOR = frozenset(CORE_ENGINES_ORDER)
+
+@functools.lru_cache(maxsize=2048)
+def parse_core_engine_type(full_engine_key):
+    """
+    从实例名 (例如 pid_1234_luid_..._engtype_3D) 中解析核心引擎类型，非核心引擎返回 None。
+    实例名在进程存活期间不变，结果按实例名缓存，热路径中不再重复 split。
+    """
+    engine_type = full_engine_key.rsplit('_', 1)[-1]
+    return engine_type if engine_type in CORE_ENGINES_TO_MONITOR else None
+
+
+class PdhGpuCollector:
+    """
+    持有一个 PDH 查询句柄，同时挂载 GPU 引擎利用率和专有显存两个通配计数器
+    (以及可选的 Committed Bytes、网络收发速率计数器)。
+    每次 poll() 只调用一次 CollectQueryData，所有数据来自同一次采集。
+    """
+
+    def __init__(self, with_committed_bytes=False, with_network=False):
+        self.query_handle = None
+        self.engine_counter = None
+        self.vram_counter = None
+        self.with_committed_bytes = with_committed_bytes
+        self.committed_counter = None
+        self.with_network = with_network
+        self.net_recv_counter = None
+        self.net_sent_counter = None
+        # 句柄与引擎计数器均就绪时为 True；采集中遇到句柄失效会被置为 False，由调用方决定何时 open() 重试
+        self.available = False
+        # 解释器退出时兜底关闭查询句柄 (close() 可重复调用)
+        atexit.register(self.close)
+
+    def open(self):
+        """
+        打开查询句柄并添加计数器，返回是否可用。已可用时直接返回。
+        """
+        if self.available:
+            logger.info("PDH 已经初始化，跳过。")
+            return True
+
+        if platform.system() != "Windows" or win32pdh is None:
+            logger.warning("非 Windows 系统或缺少 pywin32 模块，PDH 监控不可用。")
+            return False
+
+        try:
+            # 清理旧资源，以防万一
+            self.close()
+
+            self.query_handle = win32pdh.OpenQuery()
+
+            # 仅展开一次用于确认存在实例，实际读取使用单个通配计数器
+            counter_paths = win32pdh.ExpandCounterPath(ENGINE_COUNTER_PATH)
+            if counter_paths:
+                self.engine_counter = win32pdh.AddCounter(self.query_handle, ENGINE_COUNTER_PATH)
+
+            # 专有显存使用通配路径：每次 CollectQueryData 都会自动包含新启动的进程
+            try:
+                self.vram_counter = win32pdh.AddCounter(self.query_handle, VRAM_COUNTER_PATH)
+            except Exception as e:
+                self.vram_counter = None
+                logger.warning(f"添加专有显存计数器失败，VRAM 需由调用方回退到 PowerShell 获取。错误: {e}")
+
+            if self.with_committed_bytes:
+                try:
+                    self.committed_counter = win32pdh.AddCounter(self.query_handle, COMMITTED_BYTES_COUNTER_PATH)
+                except Exception as e:
+                    self.committed_counter = None
+                    logger.warning(f"添加 Committed Bytes 计数器失败，需由调用方回退到 PowerShell 获取。错误: {e}")
+
+            if self.with_network:
+                try:
+                    self.net_recv_counter = win32pdh.AddCounter(self.query_handle, NET_RECV_COUNTER_PATH)
+                    self.net_sent_counter = win32pdh.AddCounter(self.query_handle, NET_SENT_COUNTER_PATH)
+                except Exception as e:
+                    self.net_recv_counter = None
+                    self.net_sent_counter = None
+                    logger.warning(f"添加网络速率计数器失败，需由调用方回退到 psutil 计算。错误: {e}")
+
+            if self.engine_counter is None:
+                logger.error("未找到任何 GPU 引擎性能计数器实例，PDH 初始化失败。")
+                self.close()
+                return False
+
+            # 【优化】显式预热：速率类计数器需要两个采样点，间隔 100ms 采集两次，
+            # 使第一次用户可见的 poll() 就能取到有效值，而不是走 PDH_CALC_COUNTER_VALUE_FIRST 异常分支
+            win32pdh.CollectQueryData(self.query_handle)
+            time.sleep(0.1)
+            win32pdh.CollectQueryData(self.query_handle)
+            self.available = True
+            logger.success(f"PDH 成功初始化，找到 {len(counter_paths)} 个 GPU 引擎计数器实例（含进程）。")
+            return True
+
+        except Exception as e:
+            logger.error(f"PDH 初始化失败。错误: {e}")
+            self.close()
+            return False
+
+    def close(self):
+        """关闭查询句柄，释放资源。"""
+        self.available = False
+        if self.query_handle:
+            try:
+                win32pdh.CloseQuery(self.query_handle)
+                logger.info("PDH 查询资源已关闭。")
+            except Exception as e:
+                logger.error(f"关闭 PDH 查询失败: {e}")
+        self.query_handle = None
+        self.engine_counter = None
+        self.vram_counter = None
+        self.committed_counter = None
+        self.net_recv_counter = None
+        self.net_sent_counter = None
+
+    def poll(self):
+        """
+        采集一次并返回:
+        {"engines": {引擎: 利用率之和}, "vram_used_bytes": 专有显存字节数或 None,
+         "committed_bytes": 已提交内存字节数或 None,
+         "net_recv_bps"/"net_sent_bps": 网络收发速率 (字节/秒) 或 None, "instance_count": 引擎实例数}
+        PDH 不可用或句柄失效时返回 None (句柄失效时同时置 available=False)。
+        """
+        if not self.available:
+            return None
+
+        engines = {engine: 0.0 for engine in CORE_ENGINES_ORDER}
+        sample = {"engines": engines, "vram_used_bytes": None, "committed_bytes": None,
+                  "net_recv_bps": None, "net_sent_bps": None, "instance_count": 0}
+
+        try:
+            win32pdh.CollectQueryData(self.query_handle)
+        except Exception as e:
+            logger.error(f"PDH CollectQueryData 失败: {e}。标记 PDH 不可用，等待重新初始化。")
+            self.available = False
+            return None
+
+        # 一次调用取回所有实例 {full_engine_key: value}，替代逐实例 GetFormattedCounterValue
+        try:
+            instance_values = win32pdh.GetFormattedCounterArray(self.engine_counter, win32pdh.PDH_FMT_DOUBLE)
+        except win32pdh.error as e:
+            # 已预热，这里只剩暂无实例时的 PDH_NO_DATA 等偶发情况
+            if e.winerror in (win32pdh.PDH_NO_DATA, win32pdh.PDH_CALC_COUNTER_VALUE_FIRST):
+                return sample
+            logger.error(f"PDH 计数器值获取失败，错误代码: {e.winerror}。标记 PDH 不可用，等待重新初始化。")
+            self.available = False
+            return None
+
+        # 类型映射由 map 在 C 层批量完成，循环体只剩累加；非核心引擎为 None
+        engine_types = map(parse_core_engine_type, instance_values)
+        for engine_type, util_percent in zip(engine_types, instance_values.values()):
+            if engine_type is not None and util_percent > 0:
+                # 核心利用率是所有进程中该引擎的利用率之和
+                engines[engine_type] += util_percent
+        sample["instance_count"] = len(instance_values)
+
+        # 专有显存复用同一次 CollectQueryData 的结果
+        if self.vram_counter is not None:
+            try:
+                vram_values = win32pdh.GetFormattedCounterArray(self.vram_counter, win32pdh.PDH_FMT_DOUBLE)
+                sample["vram_used_bytes"] = float(sum(vram_values.values()))
+            except win32pdh.error as e:
+                logger.warning(f"PDH 读取专有显存失败: {e}")
+
+        if self.committed_counter is not None:
+            try:
+                sample["committed_bytes"] = win32pdh.GetFormattedCounterValue(self.committed_counter, win32pdh.PDH_FMT_DOUBLE)[1]
+            except win32pdh.error as e:
+                logger.warning(f"PDH 读取 Committed Bytes 失败: {e}")
+
+        if self.net_recv_counter is not None:
+            try:
+                recv_values = win32pdh.GetFormattedCounterArray(self.net_recv_counter, win32pdh.PDH_FMT_DOUBLE)
+                sent_values = win32pdh.GetFormattedCounterArray(self.net_sent_counter, win32pdh.PDH_FMT_DOUBLE)
+                sample["net_recv_bps"] = float(sum(recv_values.values()))
+                sample["net_sent_bps"] = float(sum(sent_values.values()))
+            except win32pdh.error as e:
+                logger.warning(f"PDH 读取网络速率失败: {e}")
+
+        return sample
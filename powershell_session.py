@@ -0,0 +1,115 @@
+import atexit
+import subprocess
+import threading
+from loguru import logger
+
+# ----------------------------------------------------
+# 常驻 PowerShell 会话
+# 每次 subprocess.run 启动 powershell.exe 仅启动本身就需要 200-500ms，
+# 这里只启动一次进程，之后每次查询通过 stdin 发送一行命令。
+# ----------------------------------------------------
+
+def parse_number(text):
+    """
+    解析会话输出中的数值：只取最后一行 (忽略可能夹杂的提示行)，空输出视为 0。
+    非数值时返回 None，常规路径不依赖异常处理。
+    """
+    value = text.rpartition("\n")[2].strip()
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class PowerShellSession:
+    """
+    常驻的 powershell.exe 进程：run() 发送一行命令，读取输出直到分隔行为止。
+    进程意外退出时下一次 run() 自动重启。线程安全 (同一时刻只执行一条命令)。
+    close() 不等待正在执行的命令，可在 UI 线程中直接调用；关闭后 run() 不再重启进程。
+    """
+
+    # 每条命令之后输出的分隔行，保证多行/空输出时也能准确截取本次结果
+    DELIMITER = "---"
+
+    def __init__(self, init_script=None):
+        """
+        init_script: 每次 (重新) 启动进程后执行一次的单行脚本，通常用于定义查询函数。
+        函数体只在这里解析一次，之后 run() 只需发送函数名，省去每次解析整条管道。
+        """
+        self._proc = None
+        self._lock = threading.Lock()
+        # close() 之后置为 True：run() 不再重启进程，读到的 EOF 视为会话已关闭
+        self._closed = False
+        self._init_script = init_script
+        # 解释器退出时 (包括未走窗口关闭流程的异常退出) 也结束 powershell.exe，避免残留进程
+        atexit.register(self.close)
+
+    def _start(self):
+        self._proc = subprocess.Popen(
+            ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            creationflags=subprocess.CREATE_NO_WINDOW,
+        )
+        if self._init_script:
+            self._proc.stdin.write(self._init_script + "\n")
+            self._proc.stdin.flush()
+        logger.info(f"常驻 PowerShell 会话已启动 (PID: {self._proc.pid})。")
+
+    def run(self, command):
+        """
+        执行单行 PowerShell 命令，返回其标准输出 (去除首尾空白)。
+        会话无法启动、已退出或已被 close() 关闭时抛出 RuntimeError。
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("PowerShell 会话已关闭")
+            if self._proc is None or self._proc.poll() is not None:
+                self._start()
+            # 使用局部引用：close() 可能在其他线程中 (不持有锁) 把 self._proc 置为 None
+            proc = self._proc
+
+            try:
+                proc.stdin.write(f"{command}; '{self.DELIMITER}'; [Console]::Out.Flush()\n")
+                proc.stdin.flush()
+            except (OSError, ValueError):
+                if self._closed:
+                    raise RuntimeError("PowerShell 会话已关闭")
+                raise
+
+            lines = []
+            while True:
+                line = proc.stdout.readline()
+                if not line:
+                    if self._closed:
+                        # close() 结束了进程：不重启，直接返回错误
+                        raise RuntimeError("PowerShell 会话已关闭")
+                    # EOF：PowerShell 进程意外退出，丢弃句柄，下次调用时重启
+                    self._proc = None
+                    raise RuntimeError("PowerShell 会话意外退出")
+                line = line.rstrip("\r\n")
+                if line == self.DELIMITER:
+                    return "\n".join(lines).strip()
+                lines.append(line)
+
+    def close(self):
+        """
+        结束 PowerShell 进程。不获取 self._lock，也不等待进程退出：
+        run() 正阻塞在 readline() 时 (例如 Get-Counter 尚未返回)，kill 后它会读到 EOF 并按已关闭处理，
+        因此窗口关闭不会被正在执行的查询卡住。可重复调用。
+        """
+        self._closed = True
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+        except OSError:
+            # 进程已经退出
+            pass
+        logger.info("常驻 PowerShell 会话已关闭。")
@@ -1,180 +1,130 @@
 import tkinter as tk
+from tkinter import ttk
 import time
 import sys
-import subprocess
 import psutil # <-- 用于获取系统CPU和内存信息
-from just_playback import Playback
 import platform
 from loguru import logger
-import datetime # <-- 【新增】用于获取实时时间
 import winsound
-# 【新增】引入线程池模块，用于后台数据采集
-import concurrent.futures 
+import wave
+import math
+import array
+# 【新增】回退提示音写入临时目录，供 winsound 按文件路径循环播放
+import tempfile
+# 【改动】后台采集改为常驻守护线程 + 队列，主线程定时取出结果更新 UI
+import threading
+import queue
+import collections
+# 【新增】Windows 下直接调用 GlobalMemoryStatusEx 获取内存/提交量
+import ctypes
 # 【新增】引入 os 模块，用于文件系统操作和计数
 import os # <-- ADDED
 
-# 【新增】引入 win32pdh 模块用于 GPU 引擎性能计数器
-try:
-    import win32pdh
-except ImportError:
-    logger.error("未安装 'pywin32' 模块，无法使用 PDH 性能计数器。GPU 引擎细分功能将不可用。请运行 'pip install pywin32'。")
-    # 为了防止全局变量未定义，设定一个默认值
-    win32pdh = None
+# 【改动】PDH (win32pdh) 采集统一由 pdh_collector 模块负责
+from pdh_collector import PdhGpuCollector, CORE_ENGINES_ORDER
+# 【新增】常驻 PowerShell 会话，替代每次查询都启动新的 powershell.exe
+from powershell_session import PowerShellSession, parse_number
+# 【新增】Webui 输出目录变更监视 (ReadDirectoryChangesW)，目录无写入时不再重复扫描
+from dir_watcher import DirectoryChangeWatcher
 
 
 # --- Loguru 配置 (完美的日志输出) ---
 logger.remove()
 # 完美的日志输出格式
-logger.add(sys.stderr, level="INFO", format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>", enqueue=True)
+# 【新增】日志级别可由环境变量 MONITOR_LOG 覆盖 (例如 WARNING 可屏蔽周期性的 INFO 记录，DEBUG 可查看每周期细节)
+LOG_LEVEL = os.environ.get("MONITOR_LOG", "INFO")
+LOG_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+# 【改动】pythonw 启动 (无控制台) 时 sys.stderr 为 None，不添加控制台输出
+if sys.stderr is not None:
+    logger.add(sys.stderr, level=LOG_LEVEL, format=LOG_FORMAT)
+# 【新增】设置环境变量 MONITOR_LOG_FILE 时额外写入按大小轮转的日志文件；
+# enqueue=True 由 loguru 后台线程完成文件写入，采集线程和 Tk 主线程不等待磁盘 I/O
+LOG_FILE_PATH = os.environ.get("MONITOR_LOG_FILE")
+if LOG_FILE_PATH:
+    logger.add(LOG_FILE_PATH, level=LOG_LEVEL, format=LOG_FORMAT, rotation="10 MB", retention=5, encoding="utf-8", enqueue=True)
 
 # --------------------------------------------------------------------------
 
 # ----------------------------------------------------
-# 【新增】PDH (Performance Data Helper) 初始化和全局变量
+# 【改动】PDH 查询由 pdh_collector.PdhGpuCollector 统一管理 (与 gpu_engine.py 共用实现)
 # ----------------------------------------------------
-PDH_AVAILABLE = False
-QUERY_HANDLE = None
-ENGINE_COUNTERS = {} 
-CORE_ENGINES_TO_MONITOR = ["Compute", "Copy", "3D"] 
+PDH_COLLECTOR = PdhGpuCollector(with_committed_bytes=True, with_network=True)
 ENGINE_TRANSLATIONS = {
     "Compute": "计算着色器 (AI/挖矿/并行)",
     "Copy": "数据复制 (显存/内存传输)",
     "3D": "3D 渲染 (游戏/图形加速)",
 }
+# 【优化】每个核心引擎的 (引擎, 标签前缀, 监控中断时的完整文本, StringVar 名, 进度条名) 预先计算，
+# 热路径中不再拼接/查表，每周期只格式化利用率数值
+ENGINE_DISPLAY = tuple(
+    (engine,
+     f"GPU {ENGINE_TRANSLATIONS.get(engine, engine)}: ",
+     f"GPU {ENGINE_TRANSLATIONS.get(engine, engine)}: N/A (监控中断)",
+     f"gpu_{engine.lower()}",
+     engine.lower())
+    for engine in CORE_ENGINES_ORDER
+)
+# 【优化】操作系统只在导入时判断一次，热路径中直接读取模块常量
+IS_WINDOWS = platform.system() == "Windows"
 # 硬编码总显存 (Intel Arc A770 16GB)
 INTEL_ARC_A770_TOTAL_BYTES = 16 * 1024**3 
+# 【优化】进度条颜色档位：0 绿 (< 50%) | 1 橙 (50% - 75%) | 2 红 (>= 75%)，按档位下标取样式名
+BAR_COLORS = ("green", "orange", "red")
+BAR_STYLES = tuple(f"{color.capitalize()}.Horizontal.TProgressbar" for color in BAR_COLORS)
 
-def init_pdh_resources():
-    """
-    初始化 PDH 查询句柄和 GPU 引擎计数器。
-    【改动点 1/5】: 整合 PDH 初始化逻辑。
-    """
-    global PDH_AVAILABLE, QUERY_HANDLE, ENGINE_COUNTERS
-    
-    # 防止重复初始化
-    if PDH_AVAILABLE:
-        logger.info("PDH 已经初始化，跳过。")
-        return
-
-    if platform.system() != "Windows" or win32pdh is None:
-        logger.warning("非 Windows 系统或缺少 pywin32 模块，PDH 监控不可用。")
-        PDH_AVAILABLE = False
-        return
-
-    try:
-        # 1. 清理旧资源，以防万一
-        cleanup_pdh_resources()
-        
-        QUERY_HANDLE = win32pdh.OpenQuery()
-        ENGINE_COUNTERS = {} # 清空计数器
-        
-        # 通用 GPU 引擎利用率路径
-        COUNTER_PATH = r"\GPU Engine(*)\Utilization Percentage" 
-        counter_paths = win32pdh.ExpandCounterPath(COUNTER_PATH)
-        
-        for path in counter_paths:
-            try:
-                # 提取引擎类型，例如：luid_00000000_00000000_copy_3d
-                # 注意：这里我们使用完整的路径作为 key，例如：luid_00000000_00000000_copy_3d
-                counter_handle = win32pdh.AddCounter(QUERY_HANDLE, path)
-                # 使用路径的实例名作为 key
-                full_engine_key = path.split('(')[1].split(')')[0]
-                ENGINE_COUNTERS[full_engine_key] = counter_handle
-            except Exception as e:
-                # 警告：此处的错误可能是计数器实例不存在
-                # logger.warning(f"添加计数器失败: {path}。错误: {e}")
-                pass # 忽略单个计数器添加失败
-
-        if not ENGINE_COUNTERS:
-            logger.error("未找到任何 GPU 引擎性能计数器实例，PDH 初始化失败。")
-            PDH_AVAILABLE = False
-            # 失败后关闭句柄
-            cleanup_pdh_resources()
-        else:
-            # 第一次采集数据，防止 PDH_CALC_COUNTER_VALUE_FIRST 错误
-            win32pdh.CollectQueryData(QUERY_HANDLE)
-            PDH_AVAILABLE = True
-            logger.success(f"PDH 成功初始化/恢复，找到 {len(ENGINE_COUNTERS)} 个 GPU 引擎计数器。")
-            
-    except Exception as e:
-        PDH_AVAILABLE = False
-        logger.error(f"PDH 初始化失败。错误: {e}")
-        # 确保失败后句柄被关闭
-        cleanup_pdh_resources()
+# 【新增】警报 WAV 加载失败时的回退提示音：启动时合成一次并写入临时文件，
+# 同样走 PlaySound(SND_FILENAME|SND_ASYNC|SND_LOOP) 循环播放直到警报解除，不再只响一次 MessageBeep
+FALLBACK_BEEP_WAV_PATH = os.path.join(tempfile.gettempdir(), "sd-webui_monitor_fallback_beep.wav")
 
-def get_core_gpu_utilization():
+def write_fallback_beep_wav(path=FALLBACK_BEEP_WAV_PATH, frequency=880, beep_seconds=0.4, pause_seconds=0.6, sample_rate=22050):
     """
-    获取 GPU 核心引擎 (Compute, Copy, 3D) 的聚合利用率。
-    此函数在后台线程中被调用。
+    合成 “嘀——停顿” 一个周期的 16 位单声道 WAV 并写入 path，返回时长 (秒)。
     """
-    global PDH_AVAILABLE
-    
-    if not PDH_AVAILABLE:
-        # PDH 不可用时返回默认 0 值
-        return {engine: 0 for engine in CORE_ENGINES_TO_MONITOR}
-        
-    core_engine_utilization = {engine: 0.0 for engine in CORE_ENGINES_TO_MONITOR}
+    beep_frames = int(sample_rate * beep_seconds)
+    samples = array.array('h', (
+        int(12000 * math.sin(2 * math.pi * frequency * i / sample_rate)) for i in range(beep_frames)
+    ))
+    samples.extend([0] * int(sample_rate * pause_seconds))
+    if sys.byteorder == 'big':
+        samples.byteswap() # WAV 采样为小端序
     
-    try:
-        # 采集 PDH 数据，这是 PDH 监控的关键一步
-        win32pdh.CollectQueryData(QUERY_HANDLE)
-        
-        for full_engine_key, counter_handle in ENGINE_COUNTERS.items():
-            try:
-                type_val, value = win32pdh.GetFormattedCounterValue(counter_handle, win32pdh.PDH_FMT_DOUBLE)
-                util_percent = value
-                
-                if util_percent > 0:
-                    # 提取引擎类型 (例如：luid_..._3d 提取 3D)
-                    parts = full_engine_key.split('_')
-                    # 尝试从最后一个部分获取引擎类型
-                    engine_type = parts[-1] 
-                    
-                    # 仅关注核心引擎
-                    if engine_type in CORE_ENGINES_TO_MONITOR:
-                        # 核心利用率是所有进程中该引擎的利用率之和（PDH 自动聚合）
-                        core_engine_utilization[engine_type] += util_percent
-                        
-            except Exception as e:
-                # 忽略第一次采集数据时可能出现的 PDH_CALC_COUNTER_VALUE_FIRST 或 PDH_NO_DATA
-                if hasattr(e, 'winerror') and e.winerror in [win32pdh.PDH_NO_DATA, win32pdh.PDH_CALC_COUNTER_VALUE_FIRST]:
-                     continue
-                
-                # 如果是其他 PDH 错误（如句柄失效），则记录并强制禁用 PDH 
-                if hasattr(e, 'winerror'):
-                    logger.error(f"PDH 计数器值获取失败，错误代码: {e.winerror}。强制 PDH_AVAILABLE=False 触发重试。")
-                    PDH_AVAILABLE = False
-                    # 必须跳出循环，因为句柄已失效
-                    break 
-                
-                logger.warning(f"获取 {full_engine_key} 计数器值失败: {e}")
-                
-        return core_engine_utilization
-        
-    except Exception as e:
-        # 捕获 CollectQueryData 错误（例如句柄已失效）
-        logger.error(f"PDH CollectQueryData 失败: {e}。强制 PDH_AVAILABLE=False 触发重试。")
-        PDH_AVAILABLE = False
-        # 失败时返回 0，确保程序不中断
-        return {engine: 0.0 for engine in CORE_ENGINES_TO_MONITOR}
-
-def cleanup_pdh_resources():
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(samples.tobytes())
+    return len(samples) / sample_rate
+
+# ----------------------------------------------------
+# 【新增】GlobalMemoryStatusEx：一次调用同时得到物理内存和提交量 (Commit Charge/Limit)，
+# 替代 psutil.virtual_memory() + psutil.swap_memory() 两次调用
+# ----------------------------------------------------
+class MEMORYSTATUSEX(ctypes.Structure):
+    _fields_ = [
+        ("dwLength", ctypes.c_ulong),
+        ("dwMemoryLoad", ctypes.c_ulong),
+        ("ullTotalPhys", ctypes.c_ulonglong),
+        ("ullAvailPhys", ctypes.c_ulonglong),
+        ("ullTotalPageFile", ctypes.c_ulonglong),
+        ("ullAvailPageFile", ctypes.c_ulonglong),
+        ("ullTotalVirtual", ctypes.c_ulonglong),
+        ("ullAvailVirtual", ctypes.c_ulonglong),
+        ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+    ]
+
+# 结构体只分配一次，仅由后台采集线程复用
+_MEMORY_STATUS = MEMORYSTATUSEX()
+_MEMORY_STATUS.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+
+def get_memory_status():
     """
-    关闭全局 PDH 查询句柄，释放资源。
-    【改动点 2/5】: 整合 PDH 清理逻辑。
+    调用 GlobalMemoryStatusEx 并返回 (复用的) MEMORYSTATUSEX；失败时抛出 OSError。
+    ullTotalPageFile/ullAvailPageFile 即任务管理器中的提交限制/可用提交量。
     """
-    global QUERY_HANDLE, PDH_AVAILABLE, ENGINE_COUNTERS
-    
-    if QUERY_HANDLE:
-         try:
-             win32pdh.CloseQuery(QUERY_HANDLE)
-             QUERY_HANDLE = None
-             ENGINE_COUNTERS = {}
-             # 仅清理资源，不影响 PDH_AVAILABLE 的状态判断
-             logger.info("PDH 查询资源已关闭。")
-         except Exception as e:
-             logger.error(f"关闭 PDH 查询失败: {e}")
-             
+    if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(_MEMORY_STATUS)):
+        raise ctypes.WinError()
+    return _MEMORY_STATUS
+
 # ----------------------------------------------------
 
 class IntelArcMonitorApp:
@@ -202,16 +152,62 @@ class IntelArcMonitorApp:
     
     # 连续警报次数阈值 (用于实现警报延迟触发)
     WARN_COUNT_THRESHOLD = 7
+
+    # 【优化】警报原因文本只取决于 (VRAM 警报, Webui 警报) 两个条件，预先拼接好，热路径中直接查表
+    _REASON_VRAM = f"VRAM 低于 {MEMORY_WARN_THRESHOLD_GB}GB"
+    _PENDING_WARN_REASONS = {
+        (True, False): _REASON_VRAM,
+        (False, True): "Webui 文件数持续未增加",
+        (True, True): f"{_REASON_VRAM}, Webui 文件数持续未增加",
+    }
     
     # 虚拟内存风险提醒阈值：80GB (仅用于橙色提醒，不触发铃声警报)
     VIRTUAL_MEMORY_WARN_THRESHOLD_GB = 80
     VIRTUAL_MEMORY_WARN_THRESHOLD_BYTES = VIRTUAL_MEMORY_WARN_THRESHOLD_GB * 1024**3
 
+    # 【优化】字节 -> GB / MB 换算系数 (乘法替代每周期的除法) 及固定总显存的显示文本
+    _INV_GIB = 1.0 / (1 << 30)
+    _INV_MIB = 1.0 / (1 << 20)
+    _TOTAL_GB_STR = f"{INTEL_ARC_A770_TOTAL_BYTES / (1 << 30):.2f}"
+    # 【优化】固定总显存下 “字节 -> 占用百分比” 的系数
+    _VRAM_PERCENT_PER_BYTE = 100.0 / INTEL_ARC_A770_TOTAL_BYTES
+
     # 监控更新间隔 (毫秒)
     UPDATE_INTERVAL_MS = 1500  # 1.5秒
+    # 【新增】自适应采样间隔 (毫秒)：VRAM 远高于警报阈值时放慢，接近阈值时加快
+    # VRAM 低于阈值 (警报计数中) 时保持 UPDATE_INTERVAL_MS，确保 WARN_COUNT_THRESHOLD 对应的警报延迟不变
+    NEAR_THRESHOLD_INTERVAL_MS = 500
+    IDLE_INTERVAL_MS = 5000
+    # 【新增】CPU/物理内存/虚拟内存/网络速度的独立采样间隔 (毫秒)，与 VRAM/警报的快速周期解耦
+    SYSTEM_INTERVAL_MS = 5000
+    # 【新增】窗口最小化时系统/网络数据的采样间隔 (毫秒)；VM 周期记录仍需要数据，因此只放慢不停止
+    HIDDEN_SYSTEM_INTERVAL_MS = 60000
+    # 【新增】主线程检查采集结果队列的间隔 (毫秒)
+    DRAIN_INTERVAL_MS = 50
     
+    # 【优化】“状态正常” INFO 日志的合并：数值变化超过容差或 VM 状态变化时立即记录，
+    # 否则每 NORMAL_LOG_INTERVAL_SECONDS 秒合并输出一条 (附带合并的检查次数)
+    NORMAL_LOG_INTERVAL_SECONDS = 60
+    NORMAL_LOG_UTIL_TOLERANCE = 0.5   # GPU 引擎利用率 (%)
+    NORMAL_LOG_VRAM_TOLERANCE_GB = 0.05
+    # 【新增】最近采样环形缓冲区容量，以及正式警报启动时输出到日志的条数 (事后排查用)
+    RECENT_SAMPLES_MAXLEN = 256
+    ALARM_DUMP_SAMPLES = 20
+
+    # 【新增】常驻 PowerShell 会话启动时定义的查询函数 (只解析一次，之后每周期只发送函数名)
+    # Get-LocalVram: 所有进程专有显存 (Local Usage) 之和 (Committed Bytes 已改由 GlobalMemoryStatusEx 回退)
+    PS_INIT_SCRIPT = (
+        r"function Get-LocalVram { ((Get-Counter '\GPU Process Memory(*)\Local Usage').CounterSamples | Measure-Object CookedValue -Sum).Sum }"
+    )
+
     # 【新增】PDH 重试冷却时间 (秒)
     PDH_RETRY_COOLDOWN_SECONDS = 60 
+    # 关闭窗口时等待采集线程结束本次采集的最长时间 (秒)，之后才释放 PDH 句柄
+    SAMPLER_JOIN_TIMEOUT_SECONDS = 2.0
+    # VM 周期记录间隔 (秒)
+    VM_LOG_INTERVAL_SECONDS = 1800
+    # 【新增】VM 相比上次记录变化超过该值 (GB) 时立即记录，不必等满 30 分钟；平稳期仍按周期记录
+    VM_LOG_CHANGE_THRESHOLD_GB = 1.0
 
     # 自定义警报声音文件名 (注意：这里只是文件名，路径在 __init__ 中处理)
     ALARM_WAV_FILENAME = "7 you.wav" # <-- CHANGE 1/2: 改为仅文件名
@@ -219,31 +215,47 @@ class IntelArcMonitorApp:
     # 数据条尺寸常量
     BAR_WIDTH = 250
     BAR_HEIGHT = 15
+    # 【优化】百分比 <-> 进度条像素的换算系数，量化时不再做除法
+    _BAR_PX_PER_PERCENT = BAR_WIDTH / 100
+    _PERCENT_PER_BAR_PX = 100 / BAR_WIDTH
 
     def __init__(self, master):
         """
         初始化应用程序和tkinter界面。
         """
-        # 【新增】线程池设置：用于后台获取GPU/系统数据，避免UI卡顿
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2) 
+        # 【改动】后台采集线程通过队列把结果交给主线程，避免UI卡顿
+        # 队列元素为 (fetched_data, error)，只有主线程会操作 Tk 组件和播放器
+        self._data_queue = queue.Queue()
+        # 【改动】停止信号：采集线程在两次采样之间阻塞于 wait(timeout)，关闭时 set() 立即唤醒退出
+        self._sampler_stop = threading.Event()
+        # 【新增】窗口是否可见，由主线程的 <Map>/<Unmap> 事件维护，采集线程只读
+        self._window_visible = True
         
-        # just_playback 播放器对象
-        self.playback = None 
+        # 【改动】警报 WAV 由 winsound 按文件路径异步循环播放 (替代 just_playback)，启动时只读取时长
+        # (winsound 不支持 SND_MEMORY 与 SND_ASYNC 组合，无法从内存异步循环播放)
+        self._alarm_sound_path = None
+        self._alarm_wav_seconds = 0.0 # 单次播放时长，用于统计循环次数
+        self._alarm_sound_playing = False
         
         self.master = master
         master.title("Intel Arc A770 实时监控 (GPU 核心引擎细分增强)")
         # 增大窗口以容纳数据条、时钟和 Webui 状态
         master.geometry("450x710") # <-- UPDATED SIZE to fit 3 GPU engine bars
         
-        self.os_type = platform.system()
-        if self.os_type != "Windows":
-             logger.warning(f"当前操作系统为 {self.os_type}。注意：本应用的核心功能和声音警报主要在 Windows 上有效。")
+        if not IS_WINDOWS:
+             logger.warning(f"当前操作系统为 {platform.system()}。注意：本应用的核心功能和声音警报主要在 Windows 上有效。")
         
         # 【新增】: 初始化 PDH 资源
-        init_pdh_resources()
+        PDH_COLLECTOR.open()
+        
+        # 【新增】降低本进程优先级并固定到最后一个 CPU 核心，减少监控自身对被监控负载 (Webui) 的干扰
+        self._reduce_observer_effect()
+        
+        # 【新增】PDH 不可用时的 PowerShell 回退查询 (已提交内存 / 显存) 共用一个常驻会话，首次使用时才启动
+        self.ps_session = PowerShellSession(init_script=self.PS_INIT_SCRIPT)
         
         # 【新增】：PDH 重试计数器
-        self.pdh_retry_timestamp = 0.0 # 上次尝试重初始化的时间戳
+        self.pdh_retry_timestamp = 0.0 # 上次尝试重初始化的时间 (单调时钟)
 
         # 初始化计数器
         self.total_checks = 0
@@ -256,8 +268,15 @@ class IntelArcMonitorApp:
         
         # 【新增】：正式报警开始时间（首次播放时间）
         self.alarm_start_time = None 
-        # 【新增】：歌曲循环播放次数计数器
-        self.playback_count = 0 
+        # 正式报警开始时的单调时钟时间，用于计算持续时间 (alarm_start_time 只用于显示)
+        self._alarm_start_monotonic = None
+        
+        # 【新增】：上一次输出“状态正常”日志时的 (Compute, Copy, VRAM GB, VM 风险)、输出时间及之后合并的检查次数
+        self._last_normal_log_values = None
+        self._normal_log_since = 0.0
+        self._checks_since_normal_log = 0
+        # 【新增】：最近采样 (时间戳, Compute%, Copy%, VRAM GB, Webui 文件数)，只存内存，不逐条写日志
+        self._recent_samples = collections.deque(maxlen=self.RECENT_SAMPLES_MAXLEN)
         
         # --- 周期性 VM 记录变量 ---
         # 第一次记录
@@ -266,24 +285,46 @@ class IntelArcMonitorApp:
         # 上次记录
         self.last_vm_record_time = None
         self.last_vm_used_gb = None
+        # 【优化】下一次记录的 time.monotonic() 时间点，未到期时一次比较即返回
+        self._next_vm_log_ts = 0.0
         
-        # --- 新增网络状态追踪变量 ---
-        self.last_net_bytes_sent = 0
-        self.last_net_bytes_recv = 0
-        self.last_update_time = time.time() # 记录上次更新的时间戳，用于计算速度
+        # --- 新增网络状态追踪变量 (None 表示尚未采样；仅 PDH 网络计数器不可用时才会用到) ---
+        self.last_net_bytes_sent = None
+        self.last_net_bytes_recv = None
+        self.last_update_time = time.monotonic() # 记录上次更新的单调时钟时间，用于计算速度
+        
+        # 【新增】慢速周期的系统/网络数据缓存，以及下一次刷新的时间
+        self._system_data = None
+        self._next_system_sample_time = 0.0
+        # 【新增】上一次 cpu_times 的 (总时间, 空闲时间)，用于计算 CPU 利用率
+        self._last_cpu_times = None
 
         # --- Webui 文件监控追踪变量 ---
         # Webui 输出目录的基路径 (用户自定义路径)
         self.WEBUI_OUTPUT_BASE_DIR = r'C:\stable-diffusion-webui\outputs\txt2img-images'
+        # 【优化】当天输出目录的完整路径，只在跨过本地零点后重新拼接
+        self._today_output_dir = None
+        self._output_dir_valid_until = 0.0
         # 监测 Webui 文件数量的周期 (秒，用户要求 30 秒)
         self.WEBUI_CHECK_INTERVAL_SECONDS = 30
         
-        self.last_webui_check_time = time.time() # 上次检查 Webui 文件数量的时间
+        self.last_webui_check_time = time.monotonic() # 上次检查 Webui 文件数量的时间 (单调时钟)
         self.last_webui_file_count = -1 # 上次检查到的文件数量 (-1 为初始值)
         # 连续周期内文件数量未增加的次数
         self.consecutive_webui_no_increase_count = 0 
         # 连续未增加文件数量的警报周期阈值 (连续 2 个 30 秒周期未增加，则警报)
         self.WEBUI_WARN_CYCLE_THRESHOLD = 2 
+        # 【优化】Webui 警报/计数中的状态消息模板，阈值部分在初始化时填好
+        self._webui_alert_msg_template = f"!!! 警报: Webui 生成任务可能中断 (文件数 {{}} 持续 {self.WEBUI_CHECK_INTERVAL_SECONDS * self.WEBUI_WARN_CYCLE_THRESHOLD}s 未增加) !!!"
+        self._webui_counting_msg_template = f"Webui 警报: 文件数 {{}} 未增加! 连续未增加周期: {{}}/{self.WEBUI_WARN_CYCLE_THRESHOLD}"
+        # 【优化】仅用于显示的文件数缓存：两次 30 秒判定之间最多每 WEBUI_COUNT_TTL_SECONDS 秒扫描一次目录
+        self.WEBUI_COUNT_TTL_SECONDS = 5
+        self._cached_webui_file_count = 0
+        self._next_webui_count_time = 0.0
+        # 【新增】监视输出根目录 (含按日期划分的子目录)；可用时只有目录发生变更才重新扫描
+        self._output_watcher = DirectoryChangeWatcher(self.WEBUI_OUTPUT_BASE_DIR)
+        self._output_watcher.start()
+        self._scanned_watcher_generation = None
         # ----------------------------------------------------
 
         # 【核心改动点 1/1】：计算警报文件的绝对路径
@@ -296,73 +337,88 @@ class IntelArcMonitorApp:
         # 创建并配置tkinter界面
         self._setup_gui()
         
-        # 启动定时更新
-        self.update_gpu_info()
+        # 启动后台采集线程和主线程的队列消费
+        self._sampler_thread = threading.Thread(target=self._sampler_loop, name="sampler", daemon=True)
+        self._sampler_thread.start()
+        self._drain_data_queue()
         
         self._update_clock() 
 
-        # 【新增】绑定窗口关闭事件，确保线程池能被关闭
+        # 【新增】绑定窗口关闭事件，确保采集线程能被停止
         master.protocol("WM_DELETE_WINDOW", self.on_closing) 
+        # 【新增】窗口最小化/恢复时通知采集线程放慢/恢复系统数据采样
+        master.bind("<Unmap>", self._on_window_visibility_changed)
+        master.bind("<Map>", self._on_window_visibility_changed)
 
-        # 【重要】：初始化播放器并预加载 WAV 文件
-        if self.os_type == "Windows":
+        # 【重要】：启动时校验 WAV 文件并读取单次播放时长 (不把音频数据常驻内存)
+        if IS_WINDOWS:
             try:
-                self.playback = Playback()
                 # CHANGE 2/2: 使用绝对路径加载文件
-                self.playback.load_file(self.ALARM_WAV_FILE_PATH) 
-                logger.success(f"警报文件 '{self.ALARM_WAV_FILENAME}' 加载成功。")
+                with wave.open(self.ALARM_WAV_FILE_PATH, "rb") as w:
+                    self._alarm_wav_seconds = w.getnframes() / w.getframerate()
+                self._alarm_sound_path = self.ALARM_WAV_FILE_PATH
+                logger.success(f"警报文件 '{self.ALARM_WAV_FILENAME}' 加载成功 (时长 {self._alarm_wav_seconds:.1f} 秒)。")
             except Exception as e:
-                logger.error(f"初始化或加载警报文件失败（just_playback）。请检查文件是否存在: {self.ALARM_WAV_FILE_PATH}。错误: {e}。将使用系统默认警报音作为回退。")
+                logger.error(f"加载警报文件失败。请检查文件是否存在: {self.ALARM_WAV_FILE_PATH}。错误: {e}。将使用合成的提示音作为回退。")
+                # 回退到合成的提示音 (写入临时文件)，仍可循环播放直到警报解除；写入失败时才退回系统警报音
+                try:
+                    self._alarm_wav_seconds = write_fallback_beep_wav()
+                    self._alarm_sound_path = FALLBACK_BEEP_WAV_PATH
+                except Exception as fallback_e:
+                    logger.error(f"写入回退提示音失败: {fallback_e}。警报时将只播放系统警报音。")
         
         logger.info("Intel Arc GPU 监控应用启动成功。")
 
+    def _on_window_visibility_changed(self, event):
+        """【主线程】根窗口 <Map>/<Unmap> 时更新可见标志 (子组件的同类事件也会冒泡到这里，需过滤)。"""
+        if event.widget is not self.master:
+            return
+        self._window_visible = event.type == tk.EventType.Map
+        if self._window_visible:
+            # 恢复时让下一次采样立即刷新系统数据，不必等完最小化期间的长间隔
+            self._next_system_sample_time = 0.0
+        logger.opt(lazy=True).debug("{}", lambda: f"窗口{'已恢复' if self._window_visible else '已最小化'}，系统数据采样{'恢复正常间隔' if self._window_visible else '放慢'}。")
+
     def on_closing(self):
         """
-        处理窗口关闭事件，优雅地关闭线程池和 PDH 资源。
+        处理窗口关闭事件，优雅地停止采集线程和 PDH 资源。
         【改动点 3/5】: 在关闭时清理 PDH 资源。
         """
-        logger.info("应用接收到关闭信号，正在关闭线程池...")
-        # 1. 立即关闭线程池，不等待正在运行的任务
-        self.executor.shutdown(wait=False, cancel_futures=True) 
-        # 2. 清理 PDH 资源
-        cleanup_pdh_resources()
-        # 3. 关闭主窗口
+        logger.info("应用接收到关闭信号，正在停止采集线程...")
+        # 1. 通知采集线程退出 (等待中的线程会被立即唤醒)
+        self._sampler_stop.set()
+        # 2. 先结束 PowerShell 会话：采集线程若正阻塞在回退查询中，会立即收到错误返回
+        self.ps_session.close()
+        # 停止 Webui 输出目录监视并关闭目录句柄
+        self._output_watcher.stop()
+        # 3. 等待采集线程结束本次采集，避免在 poll() 使用句柄期间关闭 PDH 查询
+        self._sampler_thread.join(self.SAMPLER_JOIN_TIMEOUT_SECONDS)
+        if self._sampler_thread.is_alive():
+            # 采集仍未结束 (PDH 调用卡住)：不在这里关闭句柄，留给进程退出时的 atexit 处理
+            logger.warning(f"采集线程在 {self.SAMPLER_JOIN_TIMEOUT_SECONDS} 秒内未结束，跳过 PDH 资源清理。")
+        else:
+            PDH_COLLECTOR.close()
+        # 4. 关闭主窗口
         self.master.destroy() 
 
 
     def _setup_progress_bar(self, name):
         """
         为指定的指标设置进度条组件。
-        进度条由一个灰色的背景Label和一个动态宽度的填充Label组成。
+        【改动】使用 ttk.Progressbar 替代 “灰色背景 Label + 动态宽度填充 Label” 的组合，
+        颜色通过切换 Green/Orange/Red 三种预定义样式实现。
         """
-        # 创建一个Frame来容纳背景和填充，以便对齐
-        frame = tk.Frame(self.master, height=self.BAR_HEIGHT, bg='SystemButtonFace')
-        frame.pack(fill='x', padx=10)
+        progressbar = ttk.Progressbar(self.master,
+                                      orient="horizontal",
+                                      length=self.BAR_WIDTH,
+                                      mode="determinate",
+                                      maximum=100,
+                                      style=BAR_STYLES[0])
+        progressbar.pack(anchor='w', padx=10)
         
-        # 灰色背景 (整体宽度)
-        bg_bar = tk.Label(frame, bg='#CCCCCC')
-        bg_bar.place(x=0, y=0, width=self.BAR_WIDTH, height=self.BAR_HEIGHT) 
-        
-        # 颜色填充条 (动态宽度，初始宽度为 0)
-        fill_bar = tk.Label(frame, bg='green', height=1)
-        fill_bar.place(x=0, y=0, width=0, height=self.BAR_HEIGHT)
-        
-        # 将组件存入实例变量
-        setattr(self, f'{name}_fill_bar', fill_bar)
-        setattr(self, f'{name}_bg_bar', bg_bar)
-
-    def _get_color(self, percentage):
-        """
-        根据百分比返回颜色代码（绿、橙、红）实现视觉警报。
-        < 50%: 绿色 | 50% - 75%: 橙色 | > 75%: 红色
-        """
-        if percentage >= 75:
-            return 'red'
-        elif percentage >= 50:
-            return 'orange'
-        else:
-            return 'green'
-
+        # 将组件存入实例变量，并登记到按名称索引的字典 (热路径直接查字典，不再拼接属性名)
+        setattr(self, f'{name}_progressbar', progressbar)
+        self._progressbars[name] = progressbar
 
     def _setup_gui(self):
         """
@@ -372,7 +428,28 @@ class IntelArcMonitorApp:
         # 调整窗口大小以容纳新增的 GPU 细分指标
         self.master.geometry("500x710") 
         
+        # 【优化】指标标签绑定 StringVar，每周期只 set 变量；_set_var 缓存上一次文本，未变化时不写入
+        self._var_text_cache = {}
+        # 【优化】状态标签上一次设置的 (text, fg) 和进度条上一次的 (数值, 颜色档位)，未变化时跳过 Tcl 调用
+        self._label_options_cache = {}
+        self._bar_state_cache = {}
+        # 【优化】进度条和 StringVar 按名称预先登记，替代热路径中的 getattr(self, f'{name}_...')
+        self._progressbars = {}
+        self._string_vars = {}
+        # 【优化】待写入的标签文本，统一在一次 after_idle 回调中写入
+        self._pending_var_texts = {}
+        self._flush_scheduled = False
+        
+        # 【新增】进度条样式：clam 主题才支持自定义进度条颜色，颜色档位见 BAR_COLORS
+        self.style = ttk.Style()
+        self.style.theme_use("clam")
+        for style_name, color in zip(BAR_STYLES, BAR_COLORS):
+            self.style.configure(style_name,
+                                 troughcolor='#CCCCCC', background=color,
+                                 thickness=self.BAR_HEIGHT, borderwidth=0)
+        
         # --- 新增：时钟标签 (1 秒刷新) ---
+        self._last_clock_text = None
         self.clock_label = tk.Label(self.master, 
                                      text="当前时间: 正在加载...", 
                                      font=('Arial', 14, 'bold'), 
@@ -384,28 +461,33 @@ class IntelArcMonitorApp:
         self.name_label.pack(pady=5)
         
         # 1. CPU 利用率 (字体统一为 14)
-        self.cpu_label = tk.Label(self.master, text="CPU 利用率: N/A", font=('Arial', 14), anchor='w')
+        self.cpu_var = tk.StringVar(value="CPU 利用率: N/A")
+        self.cpu_label = tk.Label(self.master, textvariable=self.cpu_var, font=('Arial', 14), anchor='w')
         self.cpu_label.pack(fill='x', padx=10, pady=(10, 0))
         self._setup_progress_bar('cpu')
 
         # 2. 物理内存占用
-        self.ram_label = tk.Label(self.master, text="物理内存占用: N/A", font=('Arial', 14), anchor='w')
+        self.ram_var = tk.StringVar(value="物理内存占用: N/A")
+        self.ram_label = tk.Label(self.master, textvariable=self.ram_var, font=('Arial', 14), anchor='w')
         self.ram_label.pack(fill='x', padx=10, pady=(10, 0))
         self._setup_progress_bar('ram')
 
         # 3. 虚拟内存占用
-        self.shared_memory_label = tk.Label(self.master, text="虚拟内存占用 (已提交): N/A", font=('Arial', 14), anchor='w')
+        self.shared_memory_var = tk.StringVar(value="虚拟内存占用 (已提交): N/A")
+        self.shared_memory_label = tk.Label(self.master, textvariable=self.shared_memory_var, font=('Arial', 14), anchor='w')
         self.shared_memory_label.pack(fill='x', padx=10, pady=(10, 0))
         self._setup_progress_bar('vram_system')
         
         # --- 4. 【改动点】GPU 核心引擎细分 (Compute -> Copy -> 3D) ---
-        for engine_type in CORE_ENGINES_TO_MONITOR:
+        for engine_type in CORE_ENGINES_ORDER:
             cn_name = ENGINE_TRANSLATIONS.get(engine_type, engine_type)
             # 使用 getattr 来动态创建标签和进度条变量
             label_name = f'gpu_{engine_type.lower()}_label'
             
-            # Label
-            label = tk.Label(self.master, text=f"GPU {cn_name}: N/A", font=('Arial', 14), anchor='w')
+            # Label (绑定 StringVar)
+            var = tk.StringVar(value=f"GPU {cn_name}: N/A")
+            setattr(self, f'gpu_{engine_type.lower()}_var', var)
+            label = tk.Label(self.master, textvariable=var, font=('Arial', 14), anchor='w')
             setattr(self, label_name, label)
             label.pack(fill='x', padx=10, pady=(10, 0))
             
@@ -414,18 +496,21 @@ class IntelArcMonitorApp:
         # ------------------------------------------------------------------
 
         # 5. 专有显存占用
-        self.memory_label = tk.Label(self.master, text="专有显存占用: N/A", font=('Arial', 14), anchor='w')
+        self.memory_var = tk.StringVar(value="专有显存占用: N/A")
+        self.memory_label = tk.Label(self.master, textvariable=self.memory_var, font=('Arial', 14), anchor='w')
         self.memory_label.pack(fill='x', padx=10, pady=(10, 0))
         self._setup_progress_bar('vram_local')
 
         # --- 新增：网络传输速度 ---
         # 6. 下载速度
-        self.net_recv_label = tk.Label(self.master, text="下载速度: N/A", font=('Arial', 14), anchor='w')
+        self.net_recv_var = tk.StringVar(value="下载速度: N/A")
+        self.net_recv_label = tk.Label(self.master, textvariable=self.net_recv_var, font=('Arial', 14), anchor='w')
         self.net_recv_label.pack(fill='x', padx=10, pady=(10, 0))
         self._setup_progress_bar('net_recv')
         
         # 7. 上传速度
-        self.net_sent_label = tk.Label(self.master, text="上传速度: N/A", font=('Arial', 14), anchor='w')
+        self.net_sent_var = tk.StringVar(value="上传速度: N/A")
+        self.net_sent_label = tk.Label(self.master, textvariable=self.net_sent_var, font=('Arial', 14), anchor='w')
         self.net_sent_label.pack(fill='x', padx=10, pady=(10, 0))
         self._setup_progress_bar('net_sent')
         # ---------------------------
@@ -444,60 +529,158 @@ class IntelArcMonitorApp:
         self.status_webui_label.pack(pady=(5, 5)) # 上下方留白
 
         # 日志计数标签
-        self.log_count_label = tk.Label(self.master, text="总次数: 0 | 正常: 0 | 警报触发: 0", font=('Arial', 10), anchor='w')
+        # 【优化】计数文本同样走 StringVar + _set_var，一轮积压多个采样时只写入最后一次
+        self.log_count_var = tk.StringVar(value="总次数: 0 | 正常: 0 | 警报触发: 0")
+        self.log_count_label = tk.Label(self.master, textvariable=self.log_count_var, font=('Arial', 10), anchor='w')
         self.log_count_label.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=5)
+        
+        # 登记所有指标 StringVar，供 _flush_vars 直接查字典
+        for name in ('cpu', 'ram', 'shared_memory', 'memory', 'net_recv', 'net_sent', 'log_count'):
+            self._string_vars[name] = getattr(self, f'{name}_var')
+        for _, _, _, var_name, _ in ENGINE_DISPLAY:
+            self._string_vars[var_name] = getattr(self, f'{var_name}_var')
+
+    def _set_var(self, name, text):
+        """
+        更新指标标签对应的 StringVar (self.<name>_var)。
+        文本与上一次相同时直接跳过；变化的文本先暂存，由 _flush_vars 在空闲时一次性写入，
+        同一轮中多次更新 (例如队列里积压了多个采样) 只写入最后一次。
+        """
+        if self._var_text_cache.get(name) != text:
+            self._var_text_cache[name] = text
+            self._pending_var_texts[name] = text
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self.master.after_idle(self._flush_vars)
+
+    def _config_label(self, label, **options):
+        """仅在 text/fg 等选项与上一次不同时才调用 label.config。"""
+        key = tuple(options.items())
+        if self._label_options_cache.get(label) != key:
+            self._label_options_cache[label] = key
+            label.config(**options)
+
+    def _flush_vars(self):
+        """【主线程 after_idle】把暂存的标签文本写入对应的 StringVar。"""
+        pending, self._pending_var_texts = self._pending_var_texts, {}
+        self._flush_scheduled = False
+        for name, text in pending.items():
+            self._string_vars[name].set(text)
 
     def _update_clock(self):
         """
-        独立更新时钟标签，1000ms (1秒) 刷新一次。
+        独立更新时钟标签，每秒刷新一次。
+        【优化】下一次刷新对齐到下一个整秒，文本与上次相同 (调度抖动导致同一秒内触发两次) 时不写入。
+        【优化】窗口最小化时不格式化也不写入，只保持 after 调度链，恢复后下一秒即刷新。
         """
-        current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.clock_label.config(text=f"当前时间: {current_time}")
-        self.master.after(1000, self._update_clock) # 1秒刷新
+        now = time.time()
+        if self._window_visible:
+            clock_text = f"当前时间: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))}"
+            if clock_text != self._last_clock_text:
+                self._last_clock_text = clock_text
+                self.clock_label.config(text=clock_text)
+        # 在下一个整秒之后 5ms 触发，避免因累积误差跳过某一秒
+        self.master.after(int((1.0 - now % 1.0) * 1000) + 5, self._update_clock)
 
 
-    def _get_windows_commit_charge(self):
+    def _get_vram_powershell(self):
         """
         [Windows 平台专用]
-        通过 PowerShell 性能计数器获取系统的 “已提交” 内存（Commit Charge）总数 (Bytes)。
+        PDH 未提供专有显存时，通过常驻 PowerShell 会话的 Get-Counter 采样 GPU 专有显存总和。
+        返回 vram_used_bytes，获取失败时为 None。
         """
         try:
-            # 命令获取 \Memory\Committed Bytes (总提交电荷)
-            cmd = r'powershell -ExecutionPolicy Bypass -Command "(Get-Counter \"\Memory\Committed Bytes\").CounterSamples | Select-Object -ExpandProperty CookedValue"'
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
+            # 查询函数在会话启动时已定义 (见 PS_INIT_SCRIPT)，这里只发送函数名
+            output = self.ps_session.run("Get-LocalVram")
             
-            # 返回 Committed Bytes (Bytes)
-            # 使用 or 0.0 处理 PowerShell 偶尔返回空值的情况
-            return float(result.stdout.strip() or 0)
+            # parse_number 将空值视为 0，非数值返回 None
+            vram_used_bytes = parse_number(output)
+            if vram_used_bytes is None:
+                logger.warning(f"PowerShell 性能计数器输出无法解析: {output!r}")
+            return vram_used_bytes
         
         except Exception as e:
-            logger.error(f"通过 PowerShell 获取 Committed Bytes 失败: {e}")
+            logger.error(f"通过 PowerShell 获取性能计数器失败: {e}")
+            return None
+
+    def _reduce_observer_effect(self):
+        """
+        将本进程设为 “低于正常” 优先级并绑定到最后一个逻辑 CPU，失败时只记录警告。
+        不使用 IDLE 优先级：Webui 占满 CPU 时监控 (及警报) 不能被完全饿死。
+        """
+        process = psutil.Process()
+        try:
+            if IS_WINDOWS:
+                process.nice(psutil.BELOW_NORMAL_PRIORITY_CLASS)
+            else:
+                process.nice(10)
+        except (psutil.Error, OSError) as e:
+            logger.warning(f"降低监控进程优先级失败: {e}")
+        
+        cpu_count = psutil.cpu_count() or 1
+        try:
+            process.cpu_affinity([cpu_count - 1])
+        except (AttributeError, psutil.Error, OSError) as e:
+            # 部分平台 (例如 macOS) 不支持 cpu_affinity
+            logger.warning(f"设置监控进程 CPU 亲和性失败: {e}")
+            return
+        logger.info(f"监控进程已设为低优先级，并固定在 CPU {cpu_count - 1} 上运行。")
+
+    def _get_cpu_percent(self):
+        """
+        【优化】读取一次 psutil.cpu_times()，与上次结果做差得到 CPU 利用率 (%)。
+        首次调用没有基准，返回 0.0 (与 psutil.cpu_percent(interval=None) 的首次行为一致)。
+        """
+        cpu_times = psutil.cpu_times()
+        total = sum(cpu_times)
+        idle = cpu_times.idle
+        last = self._last_cpu_times
+        self._last_cpu_times = (total, idle)
+        if last is None:
+            return 0.0
+        total_delta = total - last[0]
+        if total_delta <= 0:
             return 0.0
+        busy_delta = total_delta - (idle - last[1])
+        return max(0.0, min(100.0, busy_delta / total_delta * 100))
 
-    def _get_system_stats_psutil(self):
+    def _get_system_stats_psutil(self, committed_bytes=None):
         """
-        使用 psutil 库获取系统 CPU、物理内存和虚拟内存数据及其占用百分比。
+        获取系统 CPU、物理内存和虚拟内存数据及其占用百分比。
+        committed_bytes 为本周期 PDH 采样到的 Committed Bytes (仅 Windows)，为 None 时使用 GlobalMemoryStatusEx 的提交量。
         """
         try:
-            # 获取 CPU 利用率 (非阻塞)
-            cpu_percent = psutil.cpu_percent(interval=None) 
+            # 获取 CPU 利用率 (非阻塞，基于相邻两次 cpu_times 的差值)
+            cpu_percent = self._get_cpu_percent() 
+            
+            if IS_WINDOWS:
+                 # 【优化】一次 GlobalMemoryStatusEx 同时得到物理内存和提交量
+                 mem_status = get_memory_status()
+                 ram_total = mem_status.ullTotalPhys
+                 ram_used = ram_total - mem_status.ullAvailPhys
+                 ram_used_gb = ram_used * self._INV_GIB
+                 ram_total_gb = ram_total * self._INV_GIB
+                 ram_percent = ram_used / ram_total * 100 if ram_total > 0 else 0.0
+                 
+                 # 1. 虚拟内存 (已提交使用量 - Commit Charge)，优先使用 PDH 的 Committed Bytes (与任务管理器保持一致)
+                 if committed_bytes is None:
+                      committed_bytes = mem_status.ullTotalPageFile - mem_status.ullAvailPageFile
+                 vram_system_used_bytes = committed_bytes
+                 # 2. 虚拟内存 (总可提交量 - Commit Limit)
+                 vram_system_total_bytes = mem_status.ullTotalPageFile
+                 return cpu_percent, ram_used_gb, ram_total_gb, ram_percent, vram_system_used_bytes, vram_system_total_bytes
             
             # 获取 物理内存 (RAM)
             ram_stats = psutil.virtual_memory()
-            ram_used_gb = ram_stats.used / 1024**3
-            ram_total_gb = ram_stats.total / 1024**3 # 物理内存总量
+            ram_used_gb = ram_stats.used * self._INV_GIB
+            ram_total_gb = ram_stats.total * self._INV_GIB # 物理内存总量
             ram_percent = ram_stats.percent # 获取物理内存占用百分比
             
-            # --- 关键改动：获取 Windows 任务管理器中的 “已提交” 虚拟内存 ---
+            # 非 Windows 系统，回退到 psutil 的 RAM + Swap 使用量
             swap_stats = psutil.swap_memory()
             
-            # 1. 虚拟内存 (已提交使用量 - Commit Charge)
-            # 使用 PowerShell 获取 Committed Bytes (与任务管理器保持一致)
-            if self.os_type == "Windows":
-                 vram_system_used_bytes = self._get_windows_commit_charge()
-            else:
-                 # 非 Windows 系统，回退到 psutil 的 RAM + Swap 使用量
-                 vram_system_used_bytes = swap_stats.used + ram_stats.used
+            # 1. 虚拟内存 (RAM + Swap 使用量)
+            vram_system_used_bytes = swap_stats.used + ram_stats.used
 
             # 2. 虚拟内存 (总可提交量 - Commit Limit)
             # 总可提交量 = 物理内存总量 + 交换文件总量
@@ -512,92 +695,94 @@ class IntelArcMonitorApp:
             return None, None, None, None, None, None
 
 
-    def _get_gpu_vram_stats_windows(self):
+    def _get_gpu_vram_stats_windows(self, mem_used_bytes=None):
         """
         [Windows 平台专用]
-        通过 PowerShell 性能计数器获取 GPU **专有显存占用**。
-        【改动点 5/5】: 移除 GPU 综合性能占用获取逻辑，只保留 VRAM 逻辑。
+        计算 GPU **专有显存占用**。
+        mem_used_bytes 优先来自本周期 PDH 采集，PDH 不可用时来自 PowerShell 回退采样，均失败时为 None。
         """
-        if self.os_type != "Windows":
+        if not IS_WINDOWS:
             # 专有 VRAM 无法在非 Windows 上获取，返回 0
             return 0.0, 0.0, 0.0 
             
-        try:
-            # --- 1. 获取 专有显存占用 (Local Usage) ---
-            # 此命令与原 sd-webui_monitor.py 中用于 VRAM 获取的命令相同
-            mem_cmd = r'powershell -ExecutionPolicy Bypass -Command "((Get-Counter \"\GPU Process Memory(*)\Local Usage\").CounterSamples | Select-Object -ExpandProperty CookedValue | Measure-Object -Sum).Sum"'
-            result = subprocess.run(mem_cmd, capture_output=True, text=True, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            mem_used_bytes = float(result.stdout.strip() or 0)
-            
-            # 硬编码总显存 (Intel Arc A770 16GB)
-            mem_total_bytes = INTEL_ARC_A770_TOTAL_BYTES
-            
-            # 计算专有显存占用百分比
-            vram_local_percent = (mem_used_bytes / mem_total_bytes) * 100 if mem_total_bytes > 0 else 0
-            
-            return mem_used_bytes, mem_total_bytes, vram_local_percent
-
-        except subprocess.CalledCounterError as e:
-            logger.error(f"PowerShell VRAM 命令执行失败，错误代码: {e.returncode}，输出: {e.stderr.strip()}")
+        # 硬编码总显存 (Intel Arc A770 16GB)
+        mem_total_bytes = INTEL_ARC_A770_TOTAL_BYTES
+        
+        if mem_used_bytes is None:
             return 0.0, INTEL_ARC_A770_TOTAL_BYTES, 0.0 # 失败时返回 0.0% 和默认总显存
-        except Exception as e:
-            logger.error(f"获取 GPU VRAM 数据时发生未知错误: {e}")
-            return 0.0, INTEL_ARC_A770_TOTAL_BYTES, 0.0
-
+            
+        # 计算专有显存占用百分比 (总显存固定，乘以预先计算的系数)
+        vram_local_percent = mem_used_bytes * self._VRAM_PERCENT_PER_BYTE
+        
+        return mem_used_bytes, mem_total_bytes, vram_local_percent
 
     def _play_beep_alarm(self):
         """
-        播放自定义 WAV 文件（使用 just_playback）作为警报。
+        循环播放自定义 WAV 文件 (winsound SND_FILENAME|SND_ASYNC|SND_LOOP) 作为警报，
+        直到 _stop_alarm_sound 被调用。
         """
-        # 【新增】：记录并打印本次播放是第几次循环
-        self.playback_count += 1
-        logger.info(f"尝试播放声音警报 (第 {self.playback_count} 次循环)...")
-        if self.os_type == "Windows":
-            if self.playback:
+        logger.info("开始循环播放声音警报...")
+        if IS_WINDOWS:
+            if self._alarm_sound_path:
                 try:
-                    # 确保停止上一次的播放（防止警报堆叠）
-                    if self.playback.active:
-                        self.playback.stop() 
-                    
-                    # 重置播放位置到文件开头，确保每次都完整播放
-                    self.playback.seek(0) 
-                    # 播放预加载的文件 (非阻塞，恢复单次播放)
-                    self.playback.play()
+                    # SND_ASYNC 立即返回；新的 PlaySound 会替换正在播放的声音，不会堆叠
+                    # (SND_LOOP 必须配合 SND_ASYNC，而 winsound 拒绝 SND_MEMORY|SND_ASYNC，因此按文件路径播放)
+                    winsound.PlaySound(self._alarm_sound_path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_LOOP | winsound.SND_NODEFAULT)
+                    self._alarm_sound_playing = True
                 except Exception as e:
-                    logger.error(f"播放自定义声音文件 '{self.ALARM_WAV_FILENAME}' 失败（just_playback）：{e}。")
+                    logger.error(f"播放警报声音失败：{e}。")
                     # 播放失败时，回退到系统警报音
                     winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
             else:
-                # 如果播放器初始化失败，回退到系统警报音
+                # 警报文件不可用时，回退到系统警报音
                 winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
         else:
              # 非 Windows 系统备用方案
              print('\a', end='', flush=True) 
              logger.warning("非 Windows 系统，使用终端铃声作为替代。")
 
+    def _stop_alarm_sound(self):
+        """停止正在循环播放的警报声音。"""
+        if self._alarm_sound_playing:
+            winsound.PlaySound(None, 0)
+            self._alarm_sound_playing = False
+            logger.info("中断警报条件解除，已强制停止警报音乐。")
+
     def _update_progress_bar(self, name, percentage):
         """
-        根据百分比更新指定指标的数据条 Label 的宽度和颜色。
+        根据百分比更新指定指标的进度条数值和颜色样式。
         """
-        # 获取动态填充条的引用
-        fill_bar = getattr(self, f'{name}_fill_bar')
+        progressbar = self._progressbars[name]
         
         # 确保百分比在 0 到 100 之间，防止计算错误
         percentage = max(0, min(100, percentage))
         
-        # 计算新的宽度：总宽度 * 百分比。
-        new_width = int(self.BAR_WIDTH * (percentage / 100))
-        # 获取颜色（基于 50%/75% 阈值）
-        color = self._get_color(percentage)
+        # 按进度条像素宽度量化，肉眼不可见的变化不触发重绘
+        new_value = int(percentage * self._BAR_PX_PER_PERCENT) * self._PERCENT_PER_BAR_PX
+        # 颜色档位 (基于 50%/75% 阈值) 由布尔值相加得到，只有档位变化时才切换样式
+        bucket = (percentage >= 75) + (percentage >= 50)
+        
+        # 数值和档位都未变化时跳过，大多数稳定周期不产生任何 Tcl 调用
+        last_value, last_bucket = self._bar_state_cache.get(name, (None, None))
         
-        # 更新填充条的宽度和背景色
-        fill_bar.place(width=new_width)
-        fill_bar.config(bg=color)
+        if new_value != last_value:
+            progressbar['value'] = new_value
+        if bucket != last_bucket:
+            progressbar.configure(style=BAR_STYLES[bucket])
+        self._bar_state_cache[name] = (new_value, bucket)
         
-    def _log_vm_usage_periodically(self, current_time, vram_system_used_gb):
+    def _log_vm_usage_periodically(self, current_time, monotonic_time, vram_system_used_gb):
         """
-        周期性记录虚拟内存（VM）使用量和增量。每 30 分钟记录一次。
+        周期性记录虚拟内存（VM）使用量和增量。每 30 分钟记录一次，
+        相比上次记录变化超过 VM_LOG_CHANGE_THRESHOLD_GB 时立即记录 (并重新开始 30 分钟计时)。
+        到期判断使用单调时钟 monotonic_time，current_time (墙钟) 只用于格式化日志时间。
         """
+        # 未到期时 last_vm_used_gb 必然已有首次记录的值
+        interval_due = monotonic_time >= self._next_vm_log_ts
+        if not interval_due and abs(vram_system_used_gb - self.last_vm_used_gb) < self.VM_LOG_CHANGE_THRESHOLD_GB:
+            return
+        # 考虑到采样间隔 (0.5-5 秒)，允许一定的浮动
+        self._next_vm_log_ts = monotonic_time + self.VM_LOG_INTERVAL_SECONDS - 1.0
         
         # 第一次运行时记录初始值
         if self.first_vm_record_time is None:
@@ -606,272 +791,417 @@ class IntelArcMonitorApp:
             self.last_vm_record_time = current_time
             self.last_vm_used_gb = vram_system_used_gb
             
-            log_time_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(current_time))
             logger.info("--- 虚拟内存 (VM) 周期记录启动 ---")
-            # 控制台写清楚年月日时分秒多少虚拟内存大小
-            logger.info(f"【首次记录】{log_time_str} | VM 大小: {vram_system_used_gb:.1f} GB")
+            # 控制台写清楚年月日时分秒多少虚拟内存大小 (lazy：INFO 未启用时不格式化时间)
+            logger.opt(lazy=True).info("【首次记录】{} | VM 大小: {} GB",
+                                       lambda: time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(current_time)),
+                                       lambda: f"{vram_system_used_gb:.1f}")
             return
 
-        # 检查是否已经过了 30 分钟 (1800 秒)
-        time_since_last_record = current_time - self.last_vm_record_time
+        # 已过 30 分钟或变化较大：计算增加量
+        increase_gb = vram_system_used_gb - self.last_vm_used_gb
+        record_tag = "周期记录" if interval_due else "变化记录"
         
-        # 考虑到 UPDATE_INTERVAL_MS = 1.5秒，允许一定的浮动
-        if time_since_last_record >= 1800 - 1.0: 
-            # 计算增加量
-            increase_gb = vram_system_used_gb - self.last_vm_used_gb
-            
-            log_time_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(current_time))
-            
-            # 打印日志 (年月日时分秒多少虚拟内存大小，增加量)
-            logger.info(f"【周期记录】{log_time_str} | VM 大小: {vram_system_used_gb:.1f} GB | 增加量: {increase_gb:.1f} GB (相比上次记录)")
-            
-            # 更新上次记录值
-            self.last_vm_record_time = current_time
-            self.last_vm_used_gb = vram_system_used_gb
+        # 打印日志 (年月日时分秒多少虚拟内存大小，增加量)
+        logger.opt(lazy=True).info("{}", lambda: f"【{record_tag}】{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(current_time))} | VM 大小: {vram_system_used_gb:.1f} GB | 增加量: {increase_gb:.1f} GB (相比上次记录)")
+        
+        # 更新上次记录值
+        self.last_vm_record_time = current_time
+        self.last_vm_used_gb = vram_system_used_gb
 
     def _count_files_in_output_dir(self):
         """
         获取当天 Webui 输出目录的文件数量。
         """
         try:
-            # 1. 获取当天日期的目录名 (格式: 2025-10-20)
-            today_date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-            full_path = os.path.join(self.WEBUI_OUTPUT_BASE_DIR, today_date_str)
-            
-            if not os.path.exists(full_path):
-                # 目录不存在，Webui 可能未启动或今天未生成
-                return 0
+            # 1. 获取当天日期的目录 (目录名格式: 2025-10-20)，跨过本地零点前复用缓存的路径
+            now = time.time()
+            if now >= self._output_dir_valid_until:
+                 local_now = time.localtime(now)
+                 self._today_output_dir = os.path.join(self.WEBUI_OUTPUT_BASE_DIR, time.strftime("%Y-%m-%d", local_now))
+                 # 下一个本地零点 (mktime 会自动处理月末进位和夏令时)
+                 self._output_dir_valid_until = time.mktime((local_now.tm_year, local_now.tm_mon, local_now.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+            full_path = self._today_output_dir
 
             # 2. 统计非目录文件的数量
-            file_count = 0
-            # 排除文件夹（目录）
-            for item in os.listdir(full_path):
-                 item_path = os.path.join(full_path, item)
-                 if os.path.isfile(item_path):
-                      file_count += 1
-                      
-            return file_count
+            # 【优化】os.scandir 的目录项自带文件类型 (Windows 上来自 FindNextFile)，
+            # is_file() 无需对每个文件再做一次 stat
+            with os.scandir(full_path) as entries:
+                 return sum(1 for entry in entries if entry.is_file())
             
+        except FileNotFoundError:
+            # 目录不存在，Webui 可能未启动或今天未生成
+            return 0
         except Exception as e:
             logger.error(f"统计 Webui 输出目录文件数量失败: {e}")
             return 0 # 失败时返回 0，确保程序不中断
 
-    def _check_webui_generation_status(self, current_time):
+    def _check_webui_generation_status(self, monotonic_time):
         """
         检查 Webui 文件数量是否在周期内增加，用于判断生成任务是否中断。
+        monotonic_time 为本次采样的单调时钟时间。
         """
         
-        current_file_count = self._count_files_in_output_dir()
+        time_since_last_check = monotonic_time - self.last_webui_check_time
+        # 检查是否达到一个完整的监测周期 (30秒)，允许 1.0 秒的误差
+        check_due = time_since_last_check >= self.WEBUI_CHECK_INTERVAL_SECONDS - 1.0
+        
+        # 【优化】首次运行必定扫描目录。
+        # 目录监视可用时：仅在目录发生过变更后重新扫描 (30 秒判定时立即扫描，其余周期按 TTL 限频)，
+        # 或跨过零点后重新扫描，无写入时完全不扫描，判定始终基于最新的文件数；
+        # 不可用时：30 秒判定时必定扫描，其余周期按 TTL 复用缓存的文件数
+        watcher = self._output_watcher
+        if watcher.alive:
+             generation = watcher.generation
+             need_scan = ((generation != self._scanned_watcher_generation
+                           and (check_due or monotonic_time >= self._next_webui_count_time))
+                          or time.time() >= self._output_dir_valid_until)
+        else:
+             generation = None
+             need_scan = check_due or monotonic_time >= self._next_webui_count_time
+        if self.last_webui_file_count == -1 or need_scan:
+             # 先记录 generation 再扫描：扫描期间发生的变更会在下一周期触发重新扫描
+             self._scanned_watcher_generation = generation
+             current_file_count = self._count_files_in_output_dir()
+             self._cached_webui_file_count = current_file_count
+             self._next_webui_count_time = monotonic_time + self.WEBUI_COUNT_TTL_SECONDS
+        else:
+             current_file_count = self._cached_webui_file_count
         
         # 首次运行时或上次数量为初始值 -1
         if self.last_webui_file_count == -1:
              self.last_webui_file_count = current_file_count
-             self.last_webui_check_time = current_time
+             self.last_webui_check_time = monotonic_time
              logger.info(f"Webui 监控初始化：当前文件数 {current_file_count}。")
              # 初始状态默认正常，不触发警报
              return False, f"Webui 状态: 监控初始化完成 (文件数 {current_file_count})", current_file_count
-             
-        time_since_last_check = current_time - self.last_webui_check_time
         
-        is_webui_alert_active = False
-        # 默认状态
-        webui_status_msg = f"Webui 状态: 正在生成 (文件数 {current_file_count})"
-        
-        # 检查是否达到一个完整的监测周期 (30秒)
-        # 允许 1.0 秒的误差
-        if time_since_last_check >= self.WEBUI_CHECK_INTERVAL_SECONDS - 1.0: 
-             
-             # 1. 判断文件数量是否增加
-             if current_file_count > self.last_webui_file_count:
-                  # 文件数量有增加，Webui 正在生成
-                  # 重置未增加计数器
-                  self.consecutive_webui_no_increase_count = 0
-                  logger.debug(f"Webui 状态: 文件数量增加 ({self.last_webui_file_count} -> {current_file_count})。")
-
-             elif current_file_count <= self.last_webui_file_count:
+        if check_due: 
+             # 1. 判断文件数量是否增加：增加则清零未增加计数器，否则累加
+             increased = current_file_count > self.last_webui_file_count
+             self.consecutive_webui_no_increase_count = 0 if increased else self.consecutive_webui_no_increase_count + 1
+             if increased:
+                  logger.debug("Webui 状态: 文件数量增加 ({} -> {})。", self.last_webui_file_count, current_file_count)
+             else:
                   # 文件数量没有增加或减少，可能中断
-                  self.consecutive_webui_no_increase_count += 1
                   logger.warning(f"Webui 状态: 文件数量 {current_file_count} 未增加。连续未增加周期: {self.consecutive_webui_no_increase_count}/{self.WEBUI_WARN_CYCLE_THRESHOLD}")
-                  
-                  # 检查警报阈值
-                  if self.consecutive_webui_no_increase_count >= self.WEBUI_WARN_CYCLE_THRESHOLD:
-                       is_webui_alert_active = True
-                       webui_status_msg = f"!!! 警报: Webui 生成任务可能中断 (文件数 {current_file_count} 持续 {self.WEBUI_CHECK_INTERVAL_SECONDS * self.WEBUI_WARN_CYCLE_THRESHOLD}s 未增加) !!!"
-                  else:
-                       # 正在计数中，但未达到阈值
-                       webui_status_msg = f"Webui 警报: 文件数 {current_file_count} 未增加! 连续未增加周期: {self.consecutive_webui_no_increase_count}/{self.WEBUI_WARN_CYCLE_THRESHOLD}"
 
              # 2. 更新上次记录值
              self.last_webui_file_count = current_file_count
-             self.last_webui_check_time = current_time
+             self.last_webui_check_time = monotonic_time
              
-        # 3. 如果在周期内，返回上次的状态
-        elif self.consecutive_webui_no_increase_count > 0:
-             # 如果正在警报计数中，更新当前的状态信息
-             webui_status_msg = f"Webui 警报: 文件数 {self.last_webui_file_count} 未增加! 连续未增加周期: {self.consecutive_webui_no_increase_count}/{self.WEBUI_WARN_CYCLE_THRESHOLD}"
-             if self.consecutive_webui_no_increase_count >= self.WEBUI_WARN_CYCLE_THRESHOLD:
-                 is_webui_alert_active = True
-                 webui_status_msg = f"!!! 警报: Webui 生成任务可能中断 (文件数 {self.last_webui_file_count} 持续 {self.WEBUI_CHECK_INTERVAL_SECONDS * self.WEBUI_WARN_CYCLE_THRESHOLD}s 未增加) !!!"
-
+        # 3. 警报状态和消息统一由计数器推导 (判定周期之间沿用上次判定时的文件数)
+        no_increase_count = self.consecutive_webui_no_increase_count
+        is_webui_alert_active = no_increase_count >= self.WEBUI_WARN_CYCLE_THRESHOLD
+        if is_webui_alert_active:
+             webui_status_msg = self._webui_alert_msg_template.format(self.last_webui_file_count)
+        elif no_increase_count > 0:
+             # 正在计数中，但未达到阈值
+             webui_status_msg = self._webui_counting_msg_template.format(self.last_webui_file_count, no_increase_count)
+        else:
+             webui_status_msg = f"Webui 状态: 正在生成 (文件数 {current_file_count})"
 
         # 返回当前的警报状态、消息和文件数
         return is_webui_alert_active, webui_status_msg, current_file_count
 
-    def _try_reinitialize_pdh(self, current_time):
+    def _try_reinitialize_pdh(self, monotonic_time):
         """
         【新增方法】尝试在冷却时间后重新初始化 PDH 资源。
         此函数在后台线程中被调用。
         """
-        global PDH_AVAILABLE
-        
         # 检查是否处于冷却期
-        time_since_last_retry = current_time - self.pdh_retry_timestamp
+        time_since_last_retry = monotonic_time - self.pdh_retry_timestamp
         
         if time_since_last_retry >= self.PDH_RETRY_COOLDOWN_SECONDS:
             logger.warning(f"PDH 监控已中断。尝试重新初始化 PDH 资源 (距离上次重试 {time_since_last_retry:.1f} 秒)...")
             # 更新重试时间戳
-            self.pdh_retry_timestamp = current_time
+            self.pdh_retry_timestamp = monotonic_time
             
-            # 1. 强制清理 (以防万一)
-            cleanup_pdh_resources()
-            
-            # 2. 尝试重新初始化
-            init_pdh_resources()
-            
-            if PDH_AVAILABLE:
+            # 尝试重新初始化 (open 内部会先清理旧句柄)
+            if PDH_COLLECTOR.open():
                 logger.success("PDH 重新初始化成功。GPU 引擎细分监控已恢复。")
             else:
                 logger.error("PDH 重新初始化失败。将等待下一个冷却周期重试。")
         else:
             logger.warning(f"PDH 监控已中断，但仍在冷却期内 ({time_since_last_retry:.1f}/{self.PDH_RETRY_COOLDOWN_SECONDS} 秒)。跳过本次重试。")
     
-    def _fetch_all_data(self):
+    def _get_net_speed_psutil(self, monotonic_time):
         """
-        【后台线程】负责所有阻塞式的数据获取工作，包括 GPU VRAM、GPU 引擎细分、系统和网络I/O。
-        该方法返回一个包含所有数据的字典。
+        【回退】PDH 网络计数器不可用时，用 psutil 的累计字节差计算 (接收, 发送) 字节/秒。
         """
-        # 记录本次更新的时间
-        current_time = time.time()
-        
-        # --- 0. 检查并尝试恢复 PDH 资源 ---
-        global PDH_AVAILABLE
-        if not PDH_AVAILABLE and self.os_type == "Windows":
-             self._try_reinitialize_pdh(current_time)
-
-        # --- 1. 获取 GPU 专有 VRAM 数据 ---
-        mem_used_bytes, mem_total_bytes, vram_local_percent = self._get_gpu_vram_stats_windows()
-
-        # --- 2. 【新增】获取 GPU 核心引擎细分数据 ---
-        # 如果 PDH 仍不可用，这里将返回 0 值
-        gpu_engine_util = get_core_gpu_utilization()
-
-        # --- 3. 获取 系统数据 ---
-        cpu_percent, ram_used_gb, ram_total_gb, ram_percent, vram_system_used_bytes, vram_system_total_bytes = self._get_system_stats_psutil()
-        
-        # --- 4. 获取网络 I/O 统计并计算速度 ---
         net_io = psutil.net_io_counters()
         current_bytes_sent = net_io.bytes_sent
         current_bytes_recv = net_io.bytes_recv
         
-        time_diff = current_time - self.last_update_time
+        time_diff = monotonic_time - self.last_update_time
         
-        # 最大的预期带宽（例如 100 MB/s），用于进度条的百分比计算
-        MAX_BANDWIDTH_MBPS = 100 
-        
-        # 首次运行时 time_diff 可能为 0 或接近 0，或者 last_bytes 为 0，不进行计算或避免除以零
-        if time_diff > 0 and self.last_net_bytes_sent != 0:
-             # 计算下载和上传速度 (Bytes/秒)
+        # 首次采样没有基准，time_diff 也可能为 0，不进行计算以避免除以零
+        if time_diff > 0 and self.last_net_bytes_sent is not None:
              recv_speed_bps = (current_bytes_recv - self.last_net_bytes_recv) / time_diff
              sent_speed_bps = (current_bytes_sent - self.last_net_bytes_sent) / time_diff
-             
-             # 转换为 MB/秒
-             recv_speed_mbps = recv_speed_bps / 1024**2
-             sent_speed_mbps = sent_speed_bps / 1024**2
-             
-             # 进度条的百分比计算
-             recv_percent = (recv_speed_mbps / MAX_BANDWIDTH_MBPS) * 100
-             sent_percent = (sent_speed_mbps / MAX_BANDWIDTH_MBPS) * 100
         else:
              # 初始或计算失败时设置为 0
-             recv_speed_mbps = 0.0
-             sent_speed_mbps = 0.0
-             recv_percent = 0.0
-             sent_percent = 0.0
+             recv_speed_bps = 0.0
+             sent_speed_bps = 0.0
              
         # 更新上次的计数器和时间戳
         self.last_net_bytes_sent = current_bytes_sent
         self.last_net_bytes_recv = current_bytes_recv
-        self.last_update_time = current_time
-        
-        # --- 5. 检查 Webui 生成状态 ---
-        is_webui_alert_active, webui_status_msg, current_file_count = self._check_webui_generation_status(current_time)
-        # ------------------------------------
+        self.last_update_time = monotonic_time
+        return recv_speed_bps, sent_speed_bps
 
-        # 格式化 GPU 显存数据
-        mem_used_gb = mem_used_bytes / 1024**3
+    def _fetch_system_and_network(self, monotonic_time, committed_bytes, net_bps=None):
+        """
+        【后台线程】慢速周期 (SYSTEM_INTERVAL_MS) 采集 CPU、物理内存、虚拟内存和网络速度。
+        net_bps 为 PDH 已算好的 (接收, 发送) 字节/秒；为 None 时回退到 psutil，
+        基于相邻两次慢速采样的字节差计算。
+        """
+        # --- 1. 获取 系统数据 ---
+        cpu_percent, ram_used_gb, ram_total_gb, ram_percent, vram_system_used_bytes, vram_system_total_bytes = self._get_system_stats_psutil(committed_bytes)
         
-        vram_system_used_gb = vram_system_used_bytes / 1024**3
-        vram_system_total_gb = vram_system_total_bytes / 1024**3
+        # --- 2. 获取网络速度 ---
+        # 最大的预期带宽（例如 100 MB/s），用于进度条的百分比计算
+        MAX_BANDWIDTH_MBPS = 100 
+        
+        if net_bps is not None:
+            # 【优化】PDH 已在同一次 CollectQueryData 中算好速率，无需 psutil 和差值计算
+            recv_speed_bps, sent_speed_bps = net_bps
+        else:
+            recv_speed_bps, sent_speed_bps = self._get_net_speed_psutil(monotonic_time)
+        
+        # 转换为 MB/秒
+        recv_speed_mbps = recv_speed_bps * self._INV_MIB
+        sent_speed_mbps = sent_speed_bps * self._INV_MIB
+        
+        # 进度条的百分比计算
+        percent_per_mbps = 100 / MAX_BANDWIDTH_MBPS
+        recv_percent = recv_speed_mbps * percent_per_mbps
+        sent_percent = sent_speed_mbps * percent_per_mbps
+        
+        vram_system_used_gb = vram_system_used_bytes * self._INV_GIB
+        vram_system_total_gb = vram_system_total_bytes * self._INV_GIB
 
         return {
-            'gpu_engine_util': gpu_engine_util, # 【新增】
-            'mem_used_bytes': mem_used_bytes, 'mem_total_bytes': mem_total_bytes, 
-            'vram_local_percent': vram_local_percent, 'cpu_percent': cpu_percent, 'ram_used_gb': ram_used_gb, 
+            'cpu_percent': cpu_percent, 'ram_used_gb': ram_used_gb, 
             'ram_total_gb': ram_total_gb, 'ram_percent': ram_percent, 'vram_system_used_bytes': vram_system_used_bytes, 
             'vram_system_total_bytes': vram_system_total_bytes, 'vram_system_used_gb': vram_system_used_gb,
-            'vram_system_total_gb': vram_system_total_gb, 'mem_used_gb': mem_used_gb, 
+            'vram_system_total_gb': vram_system_total_gb, 
             'recv_speed_mbps': recv_speed_mbps, 'sent_speed_mbps': sent_speed_mbps, 
             'recv_percent': recv_percent, 'sent_percent': sent_percent, 'MAX_BANDWIDTH_MBPS': MAX_BANDWIDTH_MBPS,
-            'current_time': current_time,
+        }
+
+    def _fetch_all_data(self):
+        """
+        【后台线程】负责所有阻塞式的数据获取工作，包括 GPU VRAM、GPU 引擎细分、系统和网络I/O。
+        该方法返回一个包含所有数据的字典。
+        """
+        # 记录本次更新的时间：墙钟只用于显示/日志，所有间隔计算统一使用同一个单调时钟值
+        current_time = time.time()
+        monotonic_time = time.monotonic()
+        
+        # --- 0. 检查并尝试恢复 PDH 资源 ---
+        if not PDH_COLLECTOR.available and IS_WINDOWS:
+             self._try_reinitialize_pdh(monotonic_time)
+
+        # --- 1. 【新增】获取 GPU 核心引擎细分数据 (本周期唯一一次 CollectQueryData) ---
+        # 如果 PDH 仍不可用，这里将返回 0 值
+        pdh_sample = PDH_COLLECTOR.poll()
+        if pdh_sample is None:
+            gpu_engine_util = {engine: 0.0 for engine in CORE_ENGINES_ORDER}
+            pdh_vram_used_bytes = None
+            committed_bytes = None
+            net_bps = None
+        else:
+            gpu_engine_util = pdh_sample["engines"]
+            pdh_vram_used_bytes = pdh_sample["vram_used_bytes"]
+            committed_bytes = pdh_sample["committed_bytes"]
+            net_bps = None if pdh_sample["net_recv_bps"] is None else (pdh_sample["net_recv_bps"], pdh_sample["net_sent_bps"])
+
+        # 系统/网络数据按 SYSTEM_INTERVAL_MS 慢速刷新，其余周期复用缓存
+        system_due = monotonic_time >= self._next_system_sample_time
+
+        # --- 2. 回退：仅当 PDH 未提供专有显存时，才用一次 Get-Counter 补齐 ---
+        # (Committed Bytes 缺失时由 GlobalMemoryStatusEx 的提交量补齐，无需 PowerShell)
+        if IS_WINDOWS and pdh_vram_used_bytes is None:
+            pdh_vram_used_bytes = self._get_vram_powershell()
+
+        # --- 3. 获取 GPU 专有 VRAM 数据 (优先复用第 1 步的 PDH 采集结果) ---
+        mem_used_bytes, mem_total_bytes, vram_local_percent = self._get_gpu_vram_stats_windows(pdh_vram_used_bytes)
+
+        # --- 4. 系统数据和网络速度 (慢速周期) ---
+        if system_due:
+            self._system_data = self._fetch_system_and_network(monotonic_time, committed_bytes, net_bps)
+            # 窗口最小化时界面不显示这些数据，放慢采样 (VRAM/Webui/警报逻辑不受影响)
+            system_interval_ms = self.SYSTEM_INTERVAL_MS if self._window_visible else self.HIDDEN_SYSTEM_INTERVAL_MS
+            self._next_system_sample_time = monotonic_time + system_interval_ms / 1000
+        
+        # --- 5. 检查 Webui 生成状态 ---
+        is_webui_alert_active, webui_status_msg, current_file_count = self._check_webui_generation_status(monotonic_time)
+        # ------------------------------------
+
+        # 格式化 GPU 显存数据
+        mem_used_gb = mem_used_bytes * self._INV_GIB
+
+        fetched_data = {
+            'gpu_engine_util': gpu_engine_util, # 【新增】
+            'mem_used_bytes': mem_used_bytes, 'mem_total_bytes': mem_total_bytes, 
+            'vram_local_percent': vram_local_percent, 'mem_used_gb': mem_used_gb, 
+            **self._system_data, # CPU/内存/虚拟内存/网络 (慢速周期缓存)
+            'current_time': current_time, 'monotonic_time': monotonic_time,
             'is_webui_alert_active': is_webui_alert_active, # Webui 警报状态
             'webui_status_msg': webui_status_msg, # Webui 状态信息
             'current_file_count': current_file_count, # 当前文件数量
             'error': None # 默认无错误
         }
+        # 【优化】显示文本在后台线程中格式化，主线程只负责写入组件；窗口不可见时不格式化
+        fetched_data['metric_rows'] = self._format_metrics(fetched_data) if self._window_visible else ()
+        return fetched_data
 
 
-    def update_gpu_info(self):
+    def _sampler_loop(self):
+        """
+        【后台线程】周期采集数据并放入队列，间隔由 _next_interval_ms 根据 VRAM 自适应调整。
+        单线程顺序执行，_fetch_all_data 中的网络/Webui 状态不会被并发修改。
+        【优化】间隔按采样开始时间计算 (扣除本次采集耗时)，采样周期不会因 PDH/PowerShell 耗时而逐渐拉长。
+        """
+        while not self._sampler_stop.is_set():
+            started = time.monotonic()
+            interval_ms = self.UPDATE_INTERVAL_MS
+            try:
+                fetched_data = self._fetch_all_data()
+                self._data_queue.put_nowait((fetched_data, None))
+                interval_ms = self._next_interval_ms(fetched_data)
+            except Exception as e:
+                logger.error(f"后台线程数据获取失败: {e}")
+                self._data_queue.put_nowait((None, e))
+            # 采集耗时超过间隔时不再等待，立即开始下一次采样
+            self._sampler_stop.wait(max(0.0, started + interval_ms / 1000 - time.monotonic()))
+
+    def _next_interval_ms(self, fetched_data):
+        """
+        根据专有显存与警报阈值的距离决定下一次采样间隔：
+        低于阈值或 Webui 警报中 -> UPDATE_INTERVAL_MS；高出 < 1GB -> 500ms；高出 < 4GB -> 1500ms；其余 -> 5000ms。
+        """
+        headroom_gb = fetched_data['mem_used_gb'] - self.MEMORY_WARN_THRESHOLD_GB
+        if headroom_gb < 0 or fetched_data['is_webui_alert_active']:
+            return self.UPDATE_INTERVAL_MS
+        if headroom_gb < 1:
+            return self.NEAR_THRESHOLD_INTERVAL_MS
+        if headroom_gb < 4:
+            return self.UPDATE_INTERVAL_MS
+        return self.IDLE_INTERVAL_MS
+
+    def _drain_data_queue(self):
+        """
+        【主线程】取出队列中所有采集结果并处理 (UI 更新、警报逻辑、警报声音调用都在这里)。
+        """
+        while True:
+            try:
+                fetched_data, error = self._data_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.total_checks += 1
+            self._process_fetched_data(fetched_data=fetched_data, error=error)
+            
+        self.master.after(self.DRAIN_INTERVAL_MS, self._drain_data_queue)
+    
+    def _log_recent_samples(self):
+        """把环形缓冲区中最近 ALARM_DUMP_SAMPLES 条采样合并为一条日志输出，便于事后排查警报原因。"""
+        samples = list(self._recent_samples)[-self.ALARM_DUMP_SAMPLES:]
+        lines = [
+            f"{time.strftime('%H:%M:%S', time.localtime(ts))} | Compute: {compute:.2f}% | Copy: {copy:.2f}% | VRAM: {vram_gb:.2f} GB | Webui 文件数: {file_count}"
+            for ts, compute, copy, vram_gb, file_count in samples
+        ]
+        logger.warning("警报前最近 {} 次采样:\n{}", len(lines), "\n".join(lines))
+
+    def _normal_log_due(self, monotonic_time, compute_util, copy_util, mem_used_gb, vm_warn):
         """
-        【主线程】启动后台任务获取数据，并安排在后台任务完成后更新UI。
-        同时，立即安排下一次数据获取任务的启动时间。
+        判断本次是否需要输出“状态正常”日志：首次 (含警报解除后)、VM 风险状态变化、
+        任一数值变化超过容差，或距上次输出已达 NORMAL_LOG_INTERVAL_SECONDS 秒时需要输出。
+        需要输出时返回合并的检查次数 (含本次)，否则返回 0。
         """
-        self.total_checks += 1
+        self._checks_since_normal_log += 1
+        last = self._last_normal_log_values
+        if (last is not None
+                and monotonic_time - self._normal_log_since < self.NORMAL_LOG_INTERVAL_SECONDS
+                and vm_warn == last[3]
+                and abs(compute_util - last[0]) < self.NORMAL_LOG_UTIL_TOLERANCE
+                and abs(copy_util - last[1]) < self.NORMAL_LOG_UTIL_TOLERANCE
+                and abs(mem_used_gb - last[2]) < self.NORMAL_LOG_VRAM_TOLERANCE_GB):
+            return 0
+        merged_count = self._checks_since_normal_log
+        self._last_normal_log_values = (compute_util, copy_util, mem_used_gb, vm_warn)
+        self._normal_log_since = monotonic_time
+        self._checks_since_normal_log = 0
+        return merged_count
+
+    def _format_metrics(self, fetched_data):
+        """
+        【后台线程】把本次采样格式化为 (StringVar 名, 显示文本, 进度条名, 百分比) 列表，
+        主线程只需逐项写入，不再在 Tk 线程中拼接字符串。
+        """
+        rows = []
+        add = rows.append
         
-        # 1. 提交数据获取任务到线程池
-        future = self.executor.submit(self._fetch_all_data)
+        cpu_percent = fetched_data['cpu_percent']
+        if cpu_percent is not None:
+             # 1. CPU 利用率
+             add(('cpu', f"CPU 利用率: {cpu_percent:.1f}%", 'cpu', cpu_percent))
+             
+             # 2. 物理内存占用
+             ram_percent = fetched_data['ram_percent']
+             add(('ram', f"物理内存占用: {fetched_data['ram_used_gb']:.1f} GB / {fetched_data['ram_total_gb']:.1f} GB ({ram_percent:.1f}%)", 'ram', ram_percent))
+             
+             # 3. 虚拟内存占用 (已提交/Committed)
+             # 计算百分比
+             vram_system_total_bytes = fetched_data['vram_system_total_bytes']
+             vram_system_percent = (fetched_data['vram_system_used_bytes'] / vram_system_total_bytes) * 100 if vram_system_total_bytes > 0 else 0
+             add(('shared_memory', f"虚拟内存占用 (已提交): {fetched_data['vram_system_used_gb']:.1f} GB / {fetched_data['vram_system_total_gb']:.1f} GB ({vram_system_percent:.1f}%)", 'vram_system', vram_system_percent))
+        else:
+             # 系统数据获取失败时，显示错误信息并清空进度条
+             add(('cpu', "CPU 利用率: N/A (PSUTIL ERROR)", 'cpu', 0))
+             add(('ram', "物理内存占用: N/A (PSUTIL ERROR)", 'ram', 0))
+             add(('shared_memory', "虚拟内存占用 (已提交): N/A (PSUTIL ERROR)", 'vram_system', 0))
         
-        # 2. 任务完成后，调用 _on_data_fetch_complete 
-        future.add_done_callback(self._on_data_fetch_complete)
+        # 4. 【改动点】更新 GPU 核心引擎细分
+        # 如果 PDH 不可用，在 UI 上也给出提示
+        pdh_down = not PDH_COLLECTOR.available and IS_WINDOWS
+        gpu_engine_util = fetched_data['gpu_engine_util']
+        for engine_type, text_prefix, unavailable_text, var_name, bar_name in ENGINE_DISPLAY:
+             if pdh_down:
+                 add((var_name, unavailable_text, bar_name, 0))
+             else:
+                 util_percent = gpu_engine_util.get(engine_type, 0.0)
+                 add((var_name, f"{text_prefix}{util_percent:.2f}%", bar_name, util_percent))
+             
+        # 5. 专有显存占用
+        # 总显存为固定的 A770 16GB 时直接复用预先格式化的文本
+        mem_total_bytes = fetched_data['mem_total_bytes']
+        vram_local_percent = fetched_data['vram_local_percent']
+        total_gb_str = self._TOTAL_GB_STR if mem_total_bytes == INTEL_ARC_A770_TOTAL_BYTES else f"{mem_total_bytes * self._INV_GIB:.2f}"
+        add(('memory', f"专有显存占用: {fetched_data['mem_used_gb']:.2f} GB / {total_gb_str} GB ({vram_local_percent:.1f}%)", 'vram_local', vram_local_percent))
         
-        # 3. 安排下一次数据获取任务的提交时间 (确保周期性执行)
-        self.master.after(self.UPDATE_INTERVAL_MS, self.update_gpu_info)
+        # 6. 下载速度 / 7. 上传速度
+        max_bandwidth_mbps = fetched_data['MAX_BANDWIDTH_MBPS']
+        add(('net_recv', f"下载速度: {fetched_data['recv_speed_mbps']:.2f} MB/s (上限 {max_bandwidth_mbps} MB/s)", 'net_recv', fetched_data['recv_percent']))
+        add(('net_sent', f"上传速度: {fetched_data['sent_speed_mbps']:.2f} MB/s (上限 {max_bandwidth_mbps} MB/s)", 'net_sent', fetched_data['sent_percent']))
+        return rows
 
-    def _on_data_fetch_complete(self, future):
+    def _render_metrics(self, fetched_data):
         """
-        【工作线程】任务完成后执行的回调函数。
-        它不应直接操作UI，而是将UI更新任务安全地调度回主线程。
+        【主线程】把后台线程格式化好的指标文本和百分比写入标签和数据条。窗口最小化时由调用方跳过。
         """
-        try:
-            # 尝试获取结果或捕获异常。
-            fetched_data = future.result()
-            
-            # 将实际的 UI 更新和逻辑处理调度回主线程
-            self.master.after(0, lambda: self._process_fetched_data(fetched_data=fetched_data))
+        # 【优化】热路径中频繁调用的方法绑定为局部变量 (LOAD_FAST 代替逐次属性查找)
+        set_var = self._set_var
+        update_bar = self._update_progress_bar
+        for var_name, text, bar_name, percentage in fetched_data['metric_rows']:
+            set_var(var_name, text)
+            update_bar(bar_name, percentage)
 
-        except concurrent.futures.CancelledError:
-            # 线程池关闭时可能发生，正常处理
-            logger.info("数据获取任务被取消 (线程池关闭)。")
-        except Exception as e:
-            # 数据获取过程中的异常，仍需要调度回主线程显示
-            self.master.after(0, lambda: self._process_fetched_data(error=e))
-            logger.error(f"后台线程数据获取失败: {e}")
-    
     def _process_fetched_data(self, fetched_data=None, error=None):
         """
         【主线程】负责处理从后台获取的数据，更新UI、执行警报逻辑和日志记录。
         """
-        global PDH_AVAILABLE
-        
         if error or fetched_data is None:
             # 数据获取失败，处理错误情况
             if error is None:
@@ -880,99 +1210,45 @@ class IntelArcMonitorApp:
             error_msg = f"数据获取失败: {error}"
             logger.error(error_msg)
             # 在错误情况下，所有 Label 都显示错误信息
-            self.status_vram_label.config(text=f"错误: VRAM 数据获取失败", fg="red")
-            self.status_vm_label.config(text=f"详细信息: {error}", fg="red")
-            self.status_webui_label.config(text=f"Webui 状态: 数据获取失败", fg="red")
-            self.name_label.config(text="!!! 致命错误: 数据获取中断 !!!", fg="red")
+            self._config_label(self.status_vram_label, text=f"错误: VRAM 数据获取失败", fg="red")
+            self._config_label(self.status_vm_label, text=f"详细信息: {error}", fg="red")
+            self._config_label(self.status_webui_label, text=f"Webui 状态: 数据获取失败", fg="red")
+            self._config_label(self.name_label, text="!!! 致命错误: 数据获取中断 !!!", fg="red")
             self.failure_count += 1
-            self.log_count_label.config(text=f"总次数: {self.total_checks} | 正常: {self.success_count} | 警报触发: {self.failure_count}")
+            self._set_var('log_count', f"总次数: {self.total_checks} | 正常: {self.success_count} | 警报触发: {self.failure_count}")
             return # 退出处理
 
+        # 【优化】热路径中频繁调用的方法绑定为局部变量 (LOAD_FAST 代替逐次属性查找)
+        config_label = self._config_label
+
         # 从字典中解包数据
         gpu_engine_util = fetched_data['gpu_engine_util'] # 【新增】
         mem_used_bytes = fetched_data['mem_used_bytes']
-        mem_total_bytes = fetched_data['mem_total_bytes']
-        vram_local_percent = fetched_data['vram_local_percent']
         cpu_percent = fetched_data['cpu_percent']
-        ram_used_gb = fetched_data['ram_used_gb']
-        ram_total_gb = fetched_data['ram_total_gb']
-        ram_percent = fetched_data['ram_percent']
-        vram_system_used_bytes = fetched_data['vram_system_used_bytes']
-        vram_system_total_bytes = fetched_data['vram_system_total_bytes']
         vram_system_used_gb = fetched_data['vram_system_used_gb']
-        vram_system_total_gb = fetched_data['vram_system_total_gb']
         mem_used_gb = fetched_data['mem_used_gb']
         recv_speed_mbps = fetched_data['recv_speed_mbps']
-        sent_speed_mbps = fetched_data['sent_speed_mbps']
-        recv_percent = fetched_data['recv_percent']
-        sent_percent = fetched_data['sent_percent']
-        MAX_BANDWIDTH_MBPS = fetched_data['MAX_BANDWIDTH_MBPS']
         current_time = fetched_data['current_time']
+        monotonic_time = fetched_data['monotonic_time']
 
         # Webui 监控数据
         is_webui_alert_active = fetched_data['is_webui_alert_active']
         webui_status_msg = fetched_data['webui_status_msg']
         current_file_count = fetched_data['current_file_count']
 
+        # 记录到环形缓冲区，正式警报启动时输出最近的采样
+        self._recent_samples.append((current_time, gpu_engine_util.get("Compute", 0.0), gpu_engine_util.get("Copy", 0.0), mem_used_gb, current_file_count))
+
         # =======================================================
-        # 更新数据和数据条
+        # 更新数据和数据条 (窗口最小化时跳过，警报逻辑照常执行)
         # =======================================================
-        if cpu_percent is not None:
-             # 1. CPU 利用率
-             self.cpu_label.config(text=f"CPU 利用率: {cpu_percent:.1f}%")
-             self._update_progress_bar('cpu', cpu_percent)
-             
-             # 2. 物理内存占用
-             self.ram_label.config(text=f"物理内存占用: {ram_used_gb:.1f} GB / {ram_total_gb:.1f} GB ({ram_percent:.1f}%)")
-             self._update_progress_bar('ram', ram_percent)
-             
-             # 3. 虚拟内存占用 (已提交/Committed)
-             # 计算百分比
-             vram_system_percent = (vram_system_used_bytes / vram_system_total_bytes) * 100 if vram_system_total_bytes > 0 else 0
-             
-             self.shared_memory_label.config(text=f"虚拟内存占用 (已提交): {vram_system_used_gb:.1f} GB / {vram_system_total_gb:.1f} GB ({vram_system_percent:.1f}%)")
-             self._update_progress_bar('vram_system', vram_system_percent)
-        else:
-             # 系统数据获取失败时，显示错误信息并清空进度条
-             self.cpu_label.config(text="CPU 利用率: N/A (PSUTIL ERROR)")
-             self.ram_label.config(text="物理内存占用: N/A (PSUTIL ERROR)")
-             self.shared_memory_label.config(text="虚拟内存占用 (已提交): N/A (PSUTIL ERROR)")
-             self._update_progress_bar('cpu', 0)
-             self._update_progress_bar('ram', 0)
-             self._update_progress_bar('vram_system', 0)
+        if self._window_visible:
+            self._render_metrics(fetched_data)
+        
+        if cpu_percent is None:
              # 确保警报逻辑不依赖 None
-             vram_system_used_bytes = 0
              vram_system_used_gb = 0 
         
-        # 4. 【改动点】更新 GPU 核心引擎细分
-        for engine_type in CORE_ENGINES_TO_MONITOR:
-             util_percent = gpu_engine_util.get(engine_type, 0.0)
-             cn_name = ENGINE_TRANSLATIONS.get(engine_type, engine_type)
-             
-             label_name = f'gpu_{engine_type.lower()}_label'
-             label = getattr(self, label_name)
-             
-             # 如果 PDH 不可用，在 UI 上也给出提示
-             if not PDH_AVAILABLE and self.os_type == "Windows":
-                 label.config(text=f"GPU {cn_name}: N/A (监控中断)")
-                 self._update_progress_bar(engine_type.lower(), 0)
-             else:
-                 # 更新 Label 和 Progress Bar
-                 label.config(text=f"GPU {cn_name}: {util_percent:.2f}%")
-                 self._update_progress_bar(engine_type.lower(), util_percent)
-             
-        # 5. 专有显存占用
-        self.memory_label.config(text=f"专有显存占用: {mem_used_gb:.2f} GB / {mem_total_bytes/1024**3:.2f} GB ({vram_local_percent:.1f}%)")
-        self._update_progress_bar('vram_local', vram_local_percent)
-        
-        # 6. 下载速度
-        self.net_recv_label.config(text=f"下载速度: {recv_speed_mbps:.2f} MB/s (上限 {MAX_BANDWIDTH_MBPS} MB/s)")
-        self._update_progress_bar('net_recv', recv_percent)
-        
-        # 7. 上传速度
-        self.net_sent_label.config(text=f"上传速度: {sent_speed_mbps:.2f} MB/s (上限 {MAX_BANDWIDTH_MBPS} MB/s)")
-        self._update_progress_bar('net_sent', sent_percent)
-        
         # --- 检查警报条件 (仅 VRAM 和 Webui 触发铃声警报) ---
         
         # 警报条件触发标志：VRAM < 8GB OR Webui 持续未增加
@@ -981,7 +1257,8 @@ class IntelArcMonitorApp:
         vm_status_msg = ""
         
         # 1. 专有显存 (VRAM) 警报: < 8GB 则中断警报 (触发铃声)
-        if mem_used_bytes < self.MEMORY_WARN_THRESHOLD_BYTES: 
+        is_vram_warn_met = mem_used_bytes < self.MEMORY_WARN_THRESHOLD_BYTES
+        if is_vram_warn_met:
             vram_status_msg = f"!!! 警报: VRAM {mem_used_gb:.2f} GB (低于 {self.MEMORY_WARN_THRESHOLD_GB} GB) !!!"
             is_interrupt_warn_met = True
         # 专有显存 > 8GB，确认程序正常运行状态
@@ -1004,15 +1281,19 @@ class IntelArcMonitorApp:
         
         # --- 根据警报状态更新所有 Label ---
         if is_interrupt_warn_met:
+            # 警报状态下不合并正常日志；恢复正常后的第一条立即输出
+            self._last_normal_log_values = None
+            self._checks_since_normal_log = 0
+            
             # 触发 VRAM 或 Webui 中断警报时：所有警报相关的 Label 都显示红色
-            self.name_label.config(text="!!! 警报: 任务可能已中断 !!!", fg="red")
+            config_label(self.name_label, text="!!! 警报: 任务可能已中断 !!!", fg="red")
             
             # 第一行：专有显存状态
-            self.status_vram_label.config(text=vram_status_msg, fg="red")
+            config_label(self.status_vram_label, text=vram_status_msg, fg="red")
             # 第二行：虚拟内存风险提示
-            self.status_vm_label.config(text=vm_status_msg, fg="red") 
+            config_label(self.status_vm_label, text=vm_status_msg, fg="red") 
             # 第三行：Webui 任务状态提示
-            self.status_webui_label.config(text=webui_status_msg, fg="red")
+            config_label(self.status_webui_label, text=webui_status_msg, fg="red")
             
             # 【核心逻辑 1: 延迟触发】如果警报未激活，则累加计数器 (VRAM/Webui 警报都走这个逻辑)
             if not self.is_alarm_active:
@@ -1023,55 +1304,46 @@ class IntelArcMonitorApp:
                     
                     # 记录正式报警开始时间
                     if self.alarm_start_time is None:
-                         self.alarm_start_time = time.time()
+                         self.alarm_start_time = current_time
+                         self._alarm_start_monotonic = monotonic_time
                          start_time_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.alarm_start_time))
                          
-                         # 记录详细的警报原因
-                         warn_reasons = []
-                         if mem_used_bytes < self.MEMORY_WARN_THRESHOLD_BYTES:
-                              warn_reasons.append("VRAM 低于 8GB")
-                         if is_webui_alert_active:
-                              warn_reasons.append(f"Webui 文件数 {current_file_count} 持续未增加")
-                              
+                         # 记录详细的警报原因 (仅在进入警报时拼接一次)
+                         warn_reasons = ((self._REASON_VRAM,) if is_vram_warn_met else ()) + \
+                                        ((f"Webui 文件数 {current_file_count} 持续未增加",) if is_webui_alert_active else ())
                          logger.critical(f"正式警报已启动！报警开始时间: {start_time_str}。原因: {', '.join(warn_reasons)}")
+                         self._log_recent_samples()
                     
                     self.is_alarm_active = True
                     self.failure_count += 1
                     self.consecutive_warn_count = 0
                     self._play_beep_alarm()
                 else:
-                     # 记录详细的警报信息 (延迟触发中)
-                     current_warn_parts = []
-                     if mem_used_bytes < self.MEMORY_WARN_THRESHOLD_BYTES:
-                          current_warn_parts.append("VRAM 低于 8GB")
-                     if is_webui_alert_active:
-                          current_warn_parts.append("Webui 文件数持续未增加")
-                          
-                     logger.warning(f"中断警报条件满足 ({', '.join(current_warn_parts)})，连续计数: {self.consecutive_warn_count}/{self.WARN_COUNT_THRESHOLD}。未达警报阈值。")
+                     # 记录详细的警报信息 (延迟触发中)，原因文本直接查预先拼接的表
+                     logger.warning("中断警报条件满足 ({})，连续计数: {}/{}。未达警报阈值。",
+                                    self._PENDING_WARN_REASONS[is_vram_warn_met, is_webui_alert_active],
+                                    self.consecutive_warn_count, self.WARN_COUNT_THRESHOLD)
                      
-            # 【警报循环播放 Bug 逻辑】：如果警报已启动 (is_alarm_active=True)，但音乐已停止 (playback.active=False)，则重新启动音乐。
-            elif self.is_alarm_active and self.playback and not self.playback.active:
-                 # 播放计数和日志打印已在 _play_beep_alarm 内部处理
-                 self._play_beep_alarm()
+            # 警报已启动时音乐由 SND_LOOP 自动循环，无需在每个周期检查并重新播放
                      
         else: # 警报条件不满足 (VRAM >= 8 GB 且 Webui 状态正常)
             
             # 恢复标题颜色
-            self.name_label.config(text="GPU: Intel Arc A770 16GB", fg="black")
+            config_label(self.name_label, text="GPU: Intel Arc A770 16GB", fg="black")
 
             # 第一行：专有显存状态 (VRAM)
-            self.status_vram_label.config(text=vram_status_msg, fg="green")
+            config_label(self.status_vram_label, text=vram_status_msg, fg="green")
             
             # 第二行：虚拟内存状态 (VM) - 根据阈值设置颜色
             if vram_system_used_gb >= self.VIRTUAL_MEMORY_WARN_THRESHOLD_GB:
                  # VM 风险，橙色提醒
-                 self.status_vm_label.config(text=vm_status_msg, fg="orange")
+                 config_label(self.status_vm_label, text=vm_status_msg, fg="orange")
             else:
                  # VM 正常，恢复默认颜色或绿色
-                 self.status_vm_label.config(text=vm_status_msg, fg="SystemButtonFace") 
+                 config_label(self.status_vm_label, text=vm_status_msg, fg="SystemButtonFace") 
                  
             # 第三行：Webui 任务状态提示
-            self.status_webui_label.config(text=webui_status_msg, fg="green") # 正常时显示绿色
+            config_label(self.status_webui_label, text=webui_status_msg, fg="green") # 正常时显示绿色
 
             
             # 【核心逻辑 2: 立即停止】如果警报状态是 True，强制停止音乐 (解决警报循环 Bug)
@@ -1081,15 +1353,14 @@ class IntelArcMonitorApp:
                 # 记录和重置警报计时器和播放次数
                 if self.alarm_start_time is not None:
                      # 计算持续时间
-                     duration = time.time() - self.alarm_start_time
-                     logger.critical(f"警报已解除。警报持续时间: {duration:.1f} 秒，歌曲循环播放总次数: {self.playback_count} 次。")
+                     duration = monotonic_time - self._alarm_start_monotonic
+                     # 循环次数由持续时间和单次时长推算
+                     playback_count = math.ceil(duration / self._alarm_wav_seconds) if self._alarm_wav_seconds > 0 else 1
+                     logger.critical(f"警报已解除。警报持续时间: {duration:.1f} 秒，歌曲循环播放总次数: {playback_count} 次。")
                      self.alarm_start_time = None
-                     self.playback_count = 0
                 
-                # 警报解除时，停止播放器（包括循环播放的音乐）
-                if self.playback and self.playback.active:
-                    self.playback.stop()
-                    logger.info("中断警报条件解除，已强制停止警报音乐。")
+                # 警报解除时，停止循环播放的音乐
+                self._stop_alarm_sound()
                     
             
             # 【核心逻辑 3: 状态重置】只要不满足警报条件，就重置连续计数器
@@ -1099,26 +1370,28 @@ class IntelArcMonitorApp:
             
             self.success_count += 1
             
-            # 记录正常日志
-            if cpu_percent is not None:
-                 # 提取核心引擎利用率进行日志记录
-                 compute_util = gpu_engine_util.get("Compute", 0.0)
-                 copy_util = gpu_engine_util.get("Copy", 0.0)
-                 
-                 # PDH 不可用时，在日志中也要体现
-                 pdh_status = "正常" if PDH_AVAILABLE else "PDH 中断"
-                 
-                 log_msg = f"状态正常 ({pdh_status}) | GPU Compute: {compute_util:.2f}% | GPU Copy: {copy_util:.2f}% | VRAM: {mem_used_gb:.2f} GB | VM: {vram_system_used_gb:.1f} GB | CPU Util: {cpu_percent:.1f}% | Net Recv: {recv_speed_mbps:.2f} MB/s | Webui File Count: {current_file_count}"
-            else:
-                 log_msg = f"状态正常 | GPU 引擎数据: {gpu_engine_util} | VRAM: {mem_used_gb:.2f} GB | 系统数据获取失败 | Webui File Count: {current_file_count}"
-            logger.info(log_msg)
+            # 记录正常日志 (空闲时数值几乎不变，按容差/时间窗口合并，不输出时连字符串都不拼接)
+            # 提取核心引擎利用率进行日志记录
+            compute_util = gpu_engine_util.get("Compute", 0.0)
+            copy_util = gpu_engine_util.get("Copy", 0.0)
+            vm_warn = vram_system_used_gb >= self.VIRTUAL_MEMORY_WARN_THRESHOLD_GB
+            merged_count = self._normal_log_due(monotonic_time, compute_util, copy_util, mem_used_gb, vm_warn)
+            if merged_count:
+                # lazy=True：INFO 级别未启用 (例如部署时调高到 WARNING) 时不拼接字符串
+                if cpu_percent is not None:
+                     # PDH 不可用时，在日志中也要体现
+                     pdh_status = "正常" if PDH_COLLECTOR.available else "PDH 中断"
+                     
+                     logger.opt(lazy=True).info("{}", lambda: f"状态正常 x {merged_count} ({pdh_status}) | GPU Compute: {compute_util:.2f}% | GPU Copy: {copy_util:.2f}% | VRAM: {mem_used_gb:.2f} GB | VM: {vram_system_used_gb:.1f} GB | CPU Util: {cpu_percent:.1f}% | Net Recv: {recv_speed_mbps:.2f} MB/s | Webui File Count: {current_file_count}")
+                else:
+                     logger.opt(lazy=True).info("{}", lambda: f"状态正常 x {merged_count} | GPU 引擎数据: {gpu_engine_util} | VRAM: {mem_used_gb:.2f} GB | 系统数据获取失败 | Webui File Count: {current_file_count}")
             
         # --- 周期性 VM 使用量记录 ---
         if cpu_percent is not None:
-             self._log_vm_usage_periodically(current_time, vram_system_used_gb)
+             self._log_vm_usage_periodically(current_time, monotonic_time, vram_system_used_gb)
         
         # 更新日志计数器
-        self.log_count_label.config(text=f"总次数: {self.total_checks} | 正常: {self.success_count} | 警报触发: {self.failure_count}")
+        self._set_var('log_count', f"总次数: {self.total_checks} | 正常: {self.success_count} | 警报触发: {self.failure_count}")
 
 
 # --------------------------------------------------------------------------